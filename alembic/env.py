@@ -5,6 +5,11 @@ from alembic import context
 from app.models.user import Base
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.waitlist import WaitlistEntry
+from app.models.refresh_token import RefreshToken
+from app.models.idempotency_key import IdempotencyKey
+from app.models.course_job import CourseDeletionJob
+from app.models.analytics import CourseRoleStats, EnrollmentDailyStats
 from app.core.config import settings
 
 config = context.config
@@ -0,0 +1,38 @@
+"""add_course_enrolled_count
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('courses', sa.Column('enrolled_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counter from existing enrollments
+    op.execute(
+        """
+        UPDATE courses
+        SET enrolled_count = counts.total
+        FROM (
+            SELECT course_id, COUNT(*) AS total
+            FROM enrollments
+            GROUP BY course_id
+        ) AS counts
+        WHERE courses.id = counts.course_id
+        """
+    )
+
+    op.create_check_constraint('ck_courses_enrolled_count_nonnegative', 'courses', 'enrolled_count >= 0')
+
+def downgrade() -> None:
+    op.drop_constraint('ck_courses_enrolled_count_nonnegative', 'courses', type_='check')
+    op.drop_column('courses', 'enrolled_count')
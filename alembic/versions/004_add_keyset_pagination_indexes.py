@@ -0,0 +1,27 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Rows with a NULL sort key would silently drop out of keyset pages
+    op.execute("UPDATE courses SET created_at = now() WHERE created_at IS NULL")
+    op.execute("UPDATE enrollments SET enrolled_at = now() WHERE enrolled_at IS NULL")
+
+    op.create_index('ix_courses_created_at_id', 'courses', ['created_at', 'id'], unique=False)
+    op.create_index('ix_enrollments_enrolled_at_id', 'enrollments', ['enrolled_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_enrollments_enrolled_at_id', table_name='enrollments')
+    op.drop_index('ix_courses_created_at_id', table_name='courses')
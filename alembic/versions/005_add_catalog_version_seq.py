@@ -0,0 +1,22 @@
+"""add_catalog_version_seq
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Bumped after every catalog write; drives the ETag on GET /courses/
+    op.execute(sa.schema.CreateSequence(sa.Sequence('catalog_version_seq')))
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('catalog_version_seq')))
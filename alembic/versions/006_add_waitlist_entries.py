@@ -0,0 +1,33 @@
+"""add_waitlist_entries
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('waitlist_entries',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'course_id', name='unique_waitlist_user_course')
+    )
+    op.create_index('ix_waitlist_entries_course_id_created_at_id', 'waitlist_entries', ['course_id', 'created_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_waitlist_entries_course_id_created_at_id', table_name='waitlist_entries')
+    op.drop_table('waitlist_entries')
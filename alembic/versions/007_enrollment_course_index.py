@@ -0,0 +1,31 @@
+"""enrollment_course_index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # user_id lookups are served by unique_user_course (user_id, course_id);
+    # course_id had nothing leading on it
+    op.create_index('ix_enrollments_course_id', 'enrollments', ['course_id'], unique=False)
+
+    # Plain indexes on the primary keys duplicate the pkey indexes and only cost writes
+    op.execute("DROP INDEX IF EXISTS ix_enrollments_id")
+    op.execute("DROP INDEX IF EXISTS ix_courses_id")
+    op.execute("DROP INDEX IF EXISTS ix_users_id")
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_courses_id'), 'courses', ['id'], unique=False)
+    op.create_index(op.f('ix_enrollments_id'), 'enrollments', ['id'], unique=False)
+    op.drop_index('ix_enrollments_course_id', table_name='enrollments')
@@ -0,0 +1,33 @@
+"""add_course_search_indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('courses', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+    op.execute("CREATE INDEX ix_courses_code_title_trgm ON courses USING gin ((code || ' ' || title) gin_trgm_ops)")
+
+def downgrade() -> None:
+    op.drop_index('ix_courses_code_title_trgm', table_name='courses')
+    op.drop_index('ix_courses_search_vector', table_name='courses')
+    op.drop_column('courses', 'search_vector')
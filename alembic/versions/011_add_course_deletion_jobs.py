@@ -0,0 +1,36 @@
+"""add_course_deletion_jobs
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('course_deletion_jobs',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('enrollments_deleted', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_course_deletion_jobs_course_id', 'course_deletion_jobs', ['course_id'], unique=False)
+    op.create_index('ix_course_deletion_jobs_status', 'course_deletion_jobs', ['status'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_course_deletion_jobs_status', table_name='course_deletion_jobs')
+    op.drop_index('ix_course_deletion_jobs_course_id', table_name='course_deletion_jobs')
+    op.drop_table('course_deletion_jobs')
@@ -0,0 +1,50 @@
+"""add_enrollment_analytics
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('course_enrollment_role_stats',
+    sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('role', sa.String(length=16), nullable=False),
+    sa.Column('enrolled', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id', 'role')
+    )
+    op.create_table('enrollment_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('added', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('removed', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day', 'course_id')
+    )
+    op.create_index('ix_enrollment_daily_stats_course_id_day', 'enrollment_daily_stats', ['course_id', 'day'], unique=False)
+
+    # Backfill from existing enrollments; removals before this point are unknown
+    op.execute(
+        "INSERT INTO course_enrollment_role_stats (course_id, role, enrolled) "
+        "SELECT e.course_id, u.role::text, count(*) FROM enrollments e JOIN users u ON u.id = e.user_id "
+        "GROUP BY e.course_id, u.role"
+    )
+    op.execute(
+        "INSERT INTO enrollment_daily_stats (day, course_id, added, removed) "
+        "SELECT (coalesce(enrolled_at, now()) AT TIME ZONE 'UTC')::date AS day, course_id, count(*), 0 "
+        "FROM enrollments GROUP BY 1, course_id"
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_enrollment_daily_stats_course_id_day', table_name='enrollment_daily_stats')
+    op.drop_table('enrollment_daily_stats')
+    op.drop_table('course_enrollment_role_stats')
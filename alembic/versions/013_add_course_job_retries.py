@@ -0,0 +1,25 @@
+"""add_course_job_retries
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('course_deletion_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('course_deletion_jobs', sa.Column('retry_at', sa.DateTime(timezone=True), nullable=True))
+    # Jobs that already failed get retried too, rather than leaving their course half-deleted
+    op.execute("UPDATE course_deletion_jobs SET status = 'pending', finished_at = NULL WHERE status = 'failed'")
+
+def downgrade() -> None:
+    op.drop_column('course_deletion_jobs', 'retry_at')
+    op.drop_column('course_deletion_jobs', 'attempts')
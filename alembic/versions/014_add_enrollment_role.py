@@ -0,0 +1,29 @@
+"""add_enrollment_role
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('enrollments', sa.Column('role', sa.String(length=16), nullable=True))
+    # Roles at enrollment time were never recorded; the current role is the best guess
+    op.execute("UPDATE enrollments e SET role = u.role::text FROM users u WHERE u.id = e.user_id")
+    # Removals so far subtracted the current role, which may have drifted the counts
+    op.execute("DELETE FROM course_enrollment_role_stats")
+    op.execute(
+        "INSERT INTO course_enrollment_role_stats (course_id, role, enrolled) "
+        "SELECT course_id, role, count(*) FROM enrollments GROUP BY course_id, role"
+    )
+
+def downgrade() -> None:
+    op.drop_column('enrollments', 'role')
@@ -0,0 +1,53 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies.auth_dependencies import get_read_db, get_current_admin
+from app.models.user import User
+from app.schemas.analytics import CourseAnalytics, CourseFillRate, DailyEnrollmentStats
+from app.services.analytics import course_fill_rates, daily_enrollments, role_breakdown
+
+router = APIRouter()
+
+# Aggregates are maintained on write, so none of these scan enrollments
+
+@router.get("/courses", response_model=list[CourseFillRate])
+async def read_course_fill_rates(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    return await course_fill_rates(db, skip=skip, limit=limit, is_active=is_active)
+
+
+@router.get("/courses/{course_id}", response_model=CourseAnalytics)
+async def read_course_analytics(
+    course_id: UUID,
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    return CourseAnalytics(
+        course_id=course_id,
+        roles=await role_breakdown(db, course_id),
+        daily=await daily_enrollments(db, days, course_id),
+    )
+
+
+@router.get("/daily", response_model=list[DailyEnrollmentStats])
+async def read_daily_enrollments(
+    days: int = Query(30, ge=1, le=366),
+    course_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    return await daily_enrollments(db, days, course_id)
+
+
+@router.get("/roles", response_model=dict[str, int])
+async def read_role_breakdown(db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_admin)):
+    return await role_breakdown(db)
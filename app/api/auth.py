@@ -4,14 +4,34 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.dependencies.auth_dependencies import get_db
 from app.schemas.user import UserCreate, User
-from app.schemas.token import Token
+from app.schemas.token import Token, RefreshRequest
 from app.models.user import User as UserModel, Role
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    get_password_hash_async,
+    verify_password_async,
+    create_access_token,
+    PasswordHasherBusy,
+)
 from datetime import timedelta
 from app.core.config import settings
+from app.core.principal_cache import principal_claims
+from app.services.refresh_tokens import (
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    InvalidRefreshToken,
+    RefreshTokenReused,
+)
 
 router = APIRouter()
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=User)
 async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check BYTE length, not character length (bcrypt limit is 72 BYTES)
@@ -34,7 +54,10 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await get_password_hash_async(user.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     db_user = UserModel(
         email=user.email,
         hashed_password=hashed_password,
@@ -48,22 +71,54 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
+    return _token_response(user, refresh_token)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a new refresh token; no bcrypt involved"""
+    try:
+        user, refresh_token = await rotate_refresh_token(db, body.refresh_token)
+    except RefreshTokenReused:
+        raise _invalid_refresh_token("Refresh token reuse detected; please log in again")
+    except InvalidRefreshToken:
+        raise _invalid_refresh_token("Invalid or expired refresh token")
+    return _token_response(user, refresh_token)
+
+@router.post("/logout")
+async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    # Revokes every refresh token rotated from the same login; access tokens simply expire
+    await revoke_refresh_token(db, body.refresh_token)
+    return {"message": "Logged out"}
+
+def _token_response(user: UserModel, refresh_token: str) -> dict:
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, **principal_claims(user)}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+def _invalid_refresh_token(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
 
 async def authenticate_user(db: AsyncSession, email: str, password: str):
     result = await db.execute(select(UserModel).where(UserModel.email == email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
     return user
\ No newline at end of file
@@ -1,19 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.dependencies.auth_dependencies import get_db, get_current_admin
-from app.schemas.course import Course, CourseCreate, CourseUpdate
+from sqlalchemy import select, func
+from app.dependencies.auth_dependencies import get_db, get_read_db, get_current_admin
+from app.schemas.course import Course, CourseCreate, CourseUpdate, CourseImportReport, CourseSearchResult, CourseDeletionJob
 from app.models.course import Course as CourseModel
 from app.models.user import User
+from app.models.course_job import CourseDeletionJob as CourseDeletionJobModel
+from app.core.pagination import keyset_rows
+from app.core.fast_json import rows_response
+from app.core.catalog_cache import catalog_version, catalog_cache_headers
+from app.core.course_replica import notify_course_change
+from app.services.course_import import ImportMode, import_courses, parse_csv_rows
+from app.services.course_search import search_courses
+from app.services.course_deletion import schedule_course_deletion, course_deletion_runner
+from app.services.waitlist import waitlist_promoter
+from typing import Optional
 from uuid import UUID
+import csv
+import json
 
 router = APIRouter()
 
-@router.get("/", response_model=list[Course])
-async def read_courses(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(CourseModel).offset(skip).limit(limit))
-    courses = result.scalars().all()
-    return courses
+# Exactly the fields of the Course response model, for the lean list path
+COURSE_LIST_COLUMNS = (
+    CourseModel.code, CourseModel.title, CourseModel.description, CourseModel.capacity,
+    CourseModel.id, CourseModel.is_active, CourseModel.created_at, CourseModel.enrolled_count,
+    func.greatest(CourseModel.capacity - CourseModel.enrolled_count, 0).label("seats_remaining"),
+)
+
+@router.get("/", response_model=list[Course], dependencies=[Depends(catalog_cache_headers)])
+async def read_courses(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=1000),
+    available_only: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Keyset pagination: pass the X-Next-Cursor header back as ?cursor=
+    stmt = select(*COURSE_LIST_COLUMNS)
+    if available_only:
+        stmt = stmt.where(CourseModel.is_active.is_(True), CourseModel.enrolled_count < CourseModel.capacity)
+    if skip:
+        stmt = stmt.offset(skip)
+    rows = await keyset_rows(db, stmt, CourseModel.created_at, CourseModel.id, cursor, limit, response)
+    # Rows go straight to JSON, no ORM instances or response_model validation (app/core/fast_json.py)
+    return rows_response(rows, response)
+
+@router.get("/search", response_model=list[CourseSearchResult], dependencies=[Depends(catalog_cache_headers)])
+async def search_course_catalog(
+    q: str = Query(..., min_length=2, max_length=200, description="Words, phrases or a misspelt code/title"),
+    is_active: Optional[bool] = None,
+    available_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Ranked by relevance; results carry no description to keep pages small
+    return await search_courses(db, q, is_active=is_active, available_only=available_only, limit=limit, offset=offset)
+
+@router.get("/{course_id}", response_model=Course, dependencies=[Depends(catalog_cache_headers)])
+async def read_course(course_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(CourseModel).where(CourseModel.id == course_id))
+    db_course = result.scalar_one_or_none()
+    if not db_course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return db_course
 
 @router.post("/", response_model=Course)
 async def create_course(course: CourseCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_admin)):
@@ -23,10 +75,39 @@ async def create_course(course: CourseCreate, db: AsyncSession = Depends(get_db)
         raise HTTPException(status_code=400, detail="Course code already exists")
     db_course = CourseModel(**course.dict())
     db.add(db_course)
+    await db.flush()
+    await notify_course_change(db, db_course.id)
     await db.commit()
+    await catalog_version.bump(db)
     await db.refresh(db_course)
     return db_course
 
+@router.post("/import", response_model=CourseImportReport)
+async def import_course_batch(
+    request: Request,
+    mode: ImportMode = ImportMode.insert,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Bulk-create (or upsert) courses from a JSON array or a text/csv body"""
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        try:
+            rows = parse_csv_rows(body.decode("utf-8-sig"))
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="Body must be a UTF-8 CSV")
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+    report = await import_courses(db, rows, mode)
+    if report["created"] or report["updated"]:
+        await catalog_version.bump(db)
+    return report
+
 @router.put("/{course_id}", response_model=Course)
 async def update_course(course_id: UUID, course: CourseUpdate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_admin)):
     result = await db.execute(select(CourseModel).where(CourseModel.id == course_id))
@@ -36,16 +117,29 @@ async def update_course(course_id: UUID, course: CourseUpdate, db: AsyncSession
     update_data = course.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_course, key, value)
+    await notify_course_change(db, course_id)
     await db.commit()
+    await catalog_version.bump(db)
     await db.refresh(db_course)
+    # Raised capacity or reactivation may free seats for waitlisted students
+    if "capacity" in update_data or update_data.get("is_active"):
+        waitlist_promoter.notify(course_id)
     return db_course
 
-@router.delete("/{course_id}")
+@router.delete("/{course_id}", response_model=CourseDeletionJob, status_code=202)
 async def delete_course(course_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    result = await db.execute(select(CourseModel).where(CourseModel.id == course_id))
-    db_course = result.scalar_one_or_none()
-    if not db_course:
+    """Deactivate the course now; enrollments and the course itself are removed by a background job"""
+    job = await schedule_course_deletion(db, course_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    await db.delete(db_course)
-    await db.commit()
-    return {"message": "Course deleted"}
\ No newline at end of file
+    await catalog_version.bump(db)
+    course_deletion_runner.notify(job.id)
+    return job
+
+@router.get("/jobs/{job_id}", response_model=CourseDeletionJob)
+async def read_course_deletion_job(job_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_admin)):
+    result = await db.execute(select(CourseDeletionJobModel).where(CourseDeletionJobModel.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
\ No newline at end of file
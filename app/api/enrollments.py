@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.dependencies.auth_dependencies import get_db, get_current_student, get_current_admin
-from app.schemas.enrollment import Enrollment, EnrollmentCreate
-from app.models.enrollment import Enrollment as EnrollmentModel
-from app.models.course import Course
+from sqlalchemy import select
+from app.dependencies.auth_dependencies import get_db, get_read_db, get_current_student, get_current_admin
+from app.schemas.enrollment import Enrollment, EnrollmentCreate, BulkEnrollmentCreate, BulkEnrollmentReport
+from app.models.enrollment import Enrollment as EnrollmentModel, EnrollmentOutcome
 from app.models.user import User
+from app.services.enrollment import claim_seat, release_seat, bulk_claim_seats
+from app.services.waitlist import waitlist_promoter
+from app.services.export import ExportFormat, MEDIA_TYPES, stream_enrollments
+from app.core.pagination import keyset_rows
+from app.core.fast_json import rows_response
+from typing import Optional
 from uuid import UUID
 
 router = APIRouter()
@@ -14,31 +20,13 @@ router = APIRouter()
 async def enroll_course(enrollment: EnrollmentCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_student)):
     if current_user.id != enrollment.user_id:
         raise HTTPException(status_code=403, detail="Cannot enroll others")
-    # Check course exists and active
-    result = await db.execute(select(Course).where(Course.id == enrollment.course_id))
-    course = result.scalar_one_or_none()
-    if not course or not course.is_active:
+    outcome, db_enrollment = await claim_seat(db, enrollment.user_id, enrollment.course_id)
+    if outcome in (EnrollmentOutcome.course_not_found, EnrollmentOutcome.inactive):
         raise HTTPException(status_code=400, detail="Course not available")
-    # Check capacity
-    enrolled_count_result = await db.execute(
-        select(func.count(EnrollmentModel.id)).where(EnrollmentModel.course_id == enrollment.course_id)
-    )
-    enrolled_count = enrolled_count_result.scalar()
-    if enrolled_count >= course.capacity:
+    if outcome == EnrollmentOutcome.full:
         raise HTTPException(status_code=400, detail="Course is full")
-    # Check not already enrolled
-    result = await db.execute(
-        select(EnrollmentModel).where(
-            EnrollmentModel.user_id == enrollment.user_id,
-            EnrollmentModel.course_id == enrollment.course_id
-        )
-    )
-    if result.scalar_one_or_none():
+    if outcome == EnrollmentOutcome.duplicate:
         raise HTTPException(status_code=400, detail="Already enrolled")
-    db_enrollment = EnrollmentModel(**enrollment.dict())
-    db.add(db_enrollment)
-    await db.commit()
-    await db.refresh(db_enrollment)
     return db_enrollment
 
 @router.post("/admin/enroll", response_model=Enrollment)
@@ -48,55 +36,67 @@ async def admin_enroll_course(
     current_user: User = Depends(get_current_admin)
 ):
     """Admin endpoint to enroll any user in any course"""
-    # Verify user exists
-    user_result = await db.execute(select(User).where(User.id == enrollment.user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
+    # User existence is enforced by the foreign key inside the claim statement
+    outcome, db_enrollment = await claim_seat(db, enrollment.user_id, enrollment.course_id)
+    if outcome == EnrollmentOutcome.user_not_found:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Check course exists and active
-    course_result = await db.execute(select(Course).where(Course.id == enrollment.course_id))
-    course = course_result.scalar_one_or_none()
-    if not course or not course.is_active:
+    if outcome in (EnrollmentOutcome.course_not_found, EnrollmentOutcome.inactive):
         raise HTTPException(status_code=400, detail="Course not available")
-    
-    # Check capacity
-    enrolled_count_result = await db.execute(
-        select(func.count(EnrollmentModel.id)).where(EnrollmentModel.course_id == enrollment.course_id)
-    )
-    enrolled_count = enrolled_count_result.scalar()
-    if enrolled_count >= course.capacity:
+    if outcome == EnrollmentOutcome.full:
         raise HTTPException(status_code=400, detail="Course is full")
-    
-    # Check not already enrolled
-    existing_result = await db.execute(
-        select(EnrollmentModel).where(
-            EnrollmentModel.user_id == enrollment.user_id,
-            EnrollmentModel.course_id == enrollment.course_id
-        )
-    )
-    if existing_result.scalar_one_or_none():
+    if outcome == EnrollmentOutcome.duplicate:
         raise HTTPException(status_code=400, detail="User already enrolled in this course")
-    
-    # Create enrollment
-    db_enrollment = EnrollmentModel(**enrollment.dict())
-    db.add(db_enrollment)
-    await db.commit()
-    await db.refresh(db_enrollment)
     return db_enrollment
 
+@router.post("/admin/bulk", response_model=BulkEnrollmentReport)
+async def admin_bulk_enroll(
+    bulk: BulkEnrollmentCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Admin endpoint to enroll many users at once; reports an outcome per item"""
+    pairs = [(item.user_id, item.course_id) for item in bulk.items]
+    outcomes = await bulk_claim_seats(db, pairs)
+    results = [
+        {"user_id": user_id, "course_id": course_id, "outcome": outcome, "enrollment_id": enrollment_id}
+        for (user_id, course_id), (outcome, enrollment_id) in zip(pairs, outcomes)
+    ]
+    enrolled = sum(1 for outcome, _ in outcomes if outcome == EnrollmentOutcome.enrolled)
+    return {"enrolled": enrolled, "results": results}
+
+@router.get("/admin/export")
+async def export_enrollments(
+    format: ExportFormat = ExportFormat.ndjson,
+    with_details: bool = False,
+    current_user: User = Depends(get_current_admin),
+):
+    """Stream every enrollment as NDJSON or CSV, optionally with user email and course code"""
+    return StreamingResponse(
+        stream_enrollments(format, with_details),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="enrollments.{format.value}"'},
+    )
+
 @router.delete("/{enrollment_id}")
 async def deregister_course(enrollment_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_student)):
-    result = await db.execute(select(EnrollmentModel).where(EnrollmentModel.id == enrollment_id))
-    enrollment = result.scalar_one_or_none()
-    if not enrollment or enrollment.user_id != current_user.id:
+    course_id = await release_seat(db, enrollment_id, user_id=current_user.id)
+    if course_id is None:
         raise HTTPException(status_code=404, detail="Enrollment not found")
-    await db.delete(enrollment)
-    await db.commit()
+    waitlist_promoter.notify(course_id)
     return {"message": "Deregistered"}
 
 @router.get("/", response_model=list[Enrollment])
-async def read_enrollments(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_admin)):
-    result = await db.execute(select(EnrollmentModel).offset(skip).limit(limit))
-    enrollments = result.scalars().all()
-    return enrollments
\ No newline at end of file
+async def read_enrollments(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    # Keyset pagination: pass the X-Next-Cursor header back as ?cursor=
+    stmt = select(EnrollmentModel.user_id, EnrollmentModel.course_id, EnrollmentModel.id, EnrollmentModel.enrolled_at)
+    if skip:
+        stmt = stmt.offset(skip)
+    rows = await keyset_rows(db, stmt, EnrollmentModel.enrolled_at, EnrollmentModel.id, cursor, limit, response)
+    return rows_response(rows, response)
\ No newline at end of file
@@ -1,10 +1,67 @@
-from fastapi import APIRouter, Depends
-from app.dependencies.auth_dependencies import get_current_active_user
-from app.schemas.user import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.dependencies.auth_dependencies import get_db, get_current_active_user, get_current_active_principal, get_current_admin
+from app.schemas.user import User, UserUpdate
+from app.schemas.enrollment import UserEnrollment
 from app.models.user import User as UserModel
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.core.pagination import apply_keyset, next_cursor, NEXT_CURSOR_HEADER
+from typing import Optional
+from uuid import UUID
 
 router = APIRouter()
 
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: UserModel = Depends(get_current_active_user)):
-    return current_user
\ No newline at end of file
+    return current_user
+
+@router.get("/me/enrollments", response_model=list[UserEnrollment])
+async def read_my_enrollments(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),  # primary: a student expects to see the seat they just took
+    current_user: UserModel = Depends(get_current_active_principal),
+):
+    # One joined query; user_id is served by the unique_user_course index
+    stmt = (
+        select(
+            Enrollment.id, Enrollment.enrolled_at,
+            Course.id.label("course_id"), Course.code, Course.title,
+            Course.is_active, Course.capacity, Course.enrolled_count,
+        )
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.user_id == current_user.id)
+    )
+    result = await db.execute(apply_keyset(stmt, Enrollment.enrolled_at, Enrollment.id, cursor, limit))
+    rows = list(result.all())
+    cursor_out = next_cursor(rows, "enrolled_at", limit)
+    if cursor_out:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
+    return [
+        {
+            "id": row.id,
+            "enrolled_at": row.enrolled_at,
+            "course": {
+                "id": row.course_id, "code": row.code, "title": row.title, "is_active": row.is_active,
+                "capacity": row.capacity, "enrolled_count": row.enrolled_count,
+            },
+        }
+        for row in rows
+    ]
+
+@router.patch("/{user_id}", response_model=User)
+async def update_user(user_id: UUID, user: UserUpdate, db: AsyncSession = Depends(get_db), current_user: UserModel = Depends(get_current_admin)):
+    # Role and is_active changes evict the user from the principal cache (app/core/principal_cache.py)
+    result = await db.execute(select(UserModel).where(UserModel.id == user_id))
+    db_user = result.scalar_one_or_none()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    update_data = user.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_user, key, value)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from app.dependencies.auth_dependencies import get_db, get_current_student
+from app.schemas.waitlist import WaitlistEntry, WaitlistEntryCreate
+from app.models.waitlist import WaitlistEntry as WaitlistEntryModel
+from app.models.enrollment import Enrollment
+from app.models.course import Course
+from app.models.user import User
+from app.services.waitlist import waitlist_promoter
+from uuid import UUID
+
+router = APIRouter()
+
+@router.post("/", response_model=WaitlistEntry)
+async def join_waitlist(entry: WaitlistEntryCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_student)):
+    if current_user.id != entry.user_id:
+        raise HTTPException(status_code=403, detail="Cannot enroll others")
+    # Course state and existing enrollment in one query
+    result = await db.execute(
+        select(
+            Course.is_active,
+            select(Enrollment.id)
+            .where(Enrollment.user_id == entry.user_id, Enrollment.course_id == entry.course_id)
+            .exists()
+            .label("already_enrolled"),
+        ).where(Course.id == entry.course_id)
+    )
+    course = result.one_or_none()
+    if not course or not course.is_active:
+        raise HTTPException(status_code=400, detail="Course not available")
+    if course.already_enrolled:
+        raise HTTPException(status_code=400, detail="Already enrolled")
+    db_entry = WaitlistEntryModel(**entry.dict())
+    db.add(db_entry)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Already on waitlist")
+    await db.refresh(db_entry)
+    # A seat may already be free; the promoter decides
+    waitlist_promoter.notify(entry.course_id)
+    return db_entry
+
+@router.delete("/{entry_id}")
+async def leave_waitlist(entry_id: UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_student)):
+    result = await db.execute(
+        delete(WaitlistEntryModel)
+        .where(WaitlistEntryModel.id == entry_id, WaitlistEntryModel.user_id == current_user.id)
+        .returning(WaitlistEntryModel.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    await db.commit()
+    return {"message": "Left waitlist"}
@@ -0,0 +1,111 @@
+"""Admission control for the write-heavy routes.
+
+Enrollment and login traffic is bounded per route group and per user so
+that a registration-day burst gets fast 429s instead of queuing on the small
+DB pool. Routes that match no rule (catalog reads and the like) pass straight
+through.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import bearer_subject
+
+
+class RouteLimit:
+    def __init__(self, name: str, method: str, path_prefixes: tuple[str, ...], max_concurrency: int):
+        self.name = name
+        self.method = method
+        self.path_prefixes = path_prefixes
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and path.startswith(self.path_prefixes)
+
+
+class TokenBuckets:
+    """Per-client token buckets, LRU-bounded so idle clients are forgotten."""
+
+    def __init__(self, rate_per_second: float, burst: int, max_clients: int = 100_000):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str) -> Optional[float]:
+        """Consume a token; returns None if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate_per_second)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / self.rate_per_second
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return None
+
+
+def default_route_limits() -> list[RouteLimit]:
+    return [
+        RouteLimit("enrollment", "POST", ("/enrollments", "/waitlist"), settings.admission_enrollment_concurrency),
+        RouteLimit("auth", "POST", ("/auth/login", "/auth/register"), settings.admission_auth_concurrency),
+    ]
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_limits: Optional[list[RouteLimit]] = None,
+        buckets: Optional[TokenBuckets] = None,
+    ):
+        self.app = app
+        self.route_limits = route_limits if route_limits is not None else default_route_limits()
+        self.buckets = buckets or TokenBuckets(
+            settings.admission_user_rate_per_second,
+            settings.admission_user_burst,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = next((rl for rl in self.route_limits if rl.matches(scope["method"], scope["path"])), None)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Only authenticated callers get a bucket; anonymous login/register
+        # traffic (often many students behind one NAT) is bounded by concurrency
+        user_key = bearer_subject(scope)
+        if user_key is not None:
+            wait = self.buckets.take(f"{limit.name}:{user_key}")
+            if wait is not None:
+                await self._reject(scope, receive, send, "Too many requests", wait)
+                return
+        if limit.in_flight >= limit.max_concurrency:
+            await self._reject(scope, receive, send, "Server busy, please retry", settings.admission_retry_after_seconds)
+            return
+
+        limit.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.in_flight -= 1
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, detail: str, retry_after: float) -> None:
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=429,
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,84 @@
+"""HTTP caching for the course catalog.
+
+The catalog version lives in a Postgres sequence so every worker agrees on
+it. Each worker re-reads it at most every ``catalog_version_refresh_seconds``,
+so conditional requests inside that window get a 304 without a DB round trip.
+The version is always read on the primary: ``nextval`` logs only every 32nd
+value, so a replica's view of the sequence can stay behind for many bumps.
+
+Seat counts change with every enrollment without bumping the version, so the
+ETag also carries a time bucket of ``catalog_cache_max_age_seconds``; seat
+figures served from cache are therefore at most one bucket old.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings, AsyncSessionLocal
+from app.models.course import catalog_version_seq
+
+
+class CatalogVersion:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._value: Optional[int] = None
+        self._fetched_at = 0.0
+
+    async def get(self) -> int:
+        if self._value is not None and time.monotonic() - self._fetched_at < self.refresh_seconds:
+            return self._value
+        # Own short session on the primary, released before the request's own queries run
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(text("SELECT last_value, is_called FROM catalog_version_seq"))
+            last_value, is_called = result.one()
+        self._remember(last_value if is_called else 0)
+        return self._value
+
+    async def bump(self, db: AsyncSession) -> int:
+        # Call after the write commits so a new version never pairs with old rows
+        value = (await db.execute(select(catalog_version_seq.next_value()))).scalar_one()
+        self._remember(value)
+        return value
+
+    def _remember(self, value: int) -> None:
+        self._value = value
+        self._fetched_at = time.monotonic()
+
+
+catalog_version = CatalogVersion(settings.catalog_version_refresh_seconds)
+
+
+def make_etag(version: int, variant: str = "") -> str:
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return f'"catalog-{version}-{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+async def catalog_cache_headers(request: Request, response: Response) -> str:
+    """Set ETag/Cache-Control for a catalog read, or short-circuit with a 304.
+
+    The ETag covers the catalog version, the seat-count time bucket and the
+    query string, so every page and filter combination validates independently.
+    """
+    version = await catalog_version.get()
+    seats_bucket = int(time.time() // max(settings.catalog_cache_max_age_seconds, 1))
+    etag = make_etag(version, f"{request.url.path}?{request.url.query}#{seats_bucket}")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.catalog_cache_max_age_seconds}, must-revalidate",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return etag
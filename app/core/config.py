@@ -1,17 +1,76 @@
 from pydantic_settings import BaseSettings
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from app.core.metrics import InstrumentedQueuePool
 
 class Settings(BaseSettings):
     database_url: str
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 30  # rotating refresh tokens (see app/services/refresh_tokens.py)
+
+    # Optional read replicas, comma-separated; empty means all reads go to the primary
+    read_replica_urls: str = ""
+    read_pool_size: int = 5
+    read_max_overflow: int = 10
+    replica_retry_seconds: float = 30.0  # how long a failed replica is skipped
+
+    # bcrypt runs on a bounded executor so it never blocks the event loop
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64  # waiting calls beyond the workers before rejecting
+
+    # Authenticated-principal cache (see app/core/principal_cache.py)
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 30
+    principal_claims_max_age_seconds: int = 60  # 0 disables the DB-free role checks
+
+    # Course catalog HTTP caching (see app/core/catalog_cache.py)
+    catalog_version_refresh_seconds: float = 2.0
+    catalog_cache_max_age_seconds: int = 5
+
+    # Admission control on enrollment/login writes (see app/core/admission.py)
+    admission_enabled: bool = True
+    admission_enrollment_concurrency: int = 10
+    admission_auth_concurrency: int = 8
+    admission_user_rate_per_second: float = 2.0
+    admission_user_burst: int = 5
+    admission_retry_after_seconds: int = 1
+
+    # Idempotency-Key replay for enrollment/registration POSTs (see app/core/idempotency.py)
+    idempotency_enabled: bool = True
+    idempotency_ttl_seconds: int = 86400
+    idempotency_wait_seconds: float = 10.0  # how long a duplicate waits for the first execution
+    idempotency_lease_seconds: float = 10.0  # an unfinished claim older than this may be taken over
+    idempotency_cache_size: int = 10000
+
+    # Background course deletion (see app/services/course_deletion.py)
+    course_delete_batch_size: int = 500
+    course_delete_batch_pause_seconds: float = 0.05  # yield the table to other writers between batches
+    course_job_stale_seconds: int = 60  # a running job without progress for this long is resumed
+    course_job_max_attempts: int = 5  # failed runs are retried with backoff until then
+    course_job_retry_base_seconds: float = 5.0  # doubled after every failed attempt
+
+    # Per-worker course metadata kept fresh by LISTEN/NOTIFY (see app/core/course_replica.py).
+    # Disabling it keeps the listener for principal invalidations.
+    course_replica_enabled: bool = True
+    course_replica_load_timeout_seconds: float = 10.0
+
+    # Request-scoped SQL profiler (see app/core/query_profiler.py)
+    query_profiler_enabled: bool = True
+    query_debug_header: bool = False  # adds X-DB-Queries: "<count>; <ms>"
+    slow_query_ms: float = 200.0
+    n_plus_one_threshold: int = 5
 
     class Config:
         env_file = ".env"
         case_sensitive = False  # Allows reading from uppercase env vars
 
+    @property
+    def read_replica_url_list(self) -> list[str]:
+        return [url.strip() for url in self.read_replica_urls.split(",") if url.strip()]
+
 settings = Settings()
 
 # Simplified engine creation - let asyncpg handle SSL automatically
@@ -21,10 +80,29 @@ engine = create_async_engine(
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
+    poolclass=InstrumentedQueuePool,
 )
 
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
-)
\ No newline at end of file
+)
+
+# Read-only traffic gets its own pools so it never competes with writes
+read_engines = [
+    create_async_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=settings.read_pool_size,
+        max_overflow=settings.read_max_overflow,
+        poolclass=InstrumentedQueuePool,
+    )
+    for url in settings.read_replica_url_list
+]
+
+ReadSessionLocals = [
+    sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    for read_engine in read_engines
+]
\ No newline at end of file
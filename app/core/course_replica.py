@@ -0,0 +1,216 @@
+"""In-process replica of course metadata.
+
+Each worker keeps ``is_active`` and ``capacity`` of every course in memory,
+so enrollment requests for missing or inactive courses are turned away
+without a transaction or a course row lock. The seat counter is not
+replicated: the capacity check stays inside the claim statement.
+
+Every catalog write sends ``NOTIFY course_changes`` with the course id (or
+``*`` when many courses changed) inside its own transaction, so the
+notification is delivered exactly when the change commits. Each worker
+LISTENs on a dedicated asyncpg connection outside the pools and re-reads the
+course, or everything, on that same connection. The replica remembers the
+catalog version (``catalog_version_seq``) it last read; a miss is answered
+from the database together with the current version, and a newer version
+there means a change was missed, so the whole replica is reloaded.
+
+While the listener is down the replica reports itself not ``live`` and
+callers fall back to the database; reconnecting reloads everything.
+
+Other in-process caches can ``subscribe`` to further channels on the same
+connection rather than opening their own. With ``replicate=False`` the
+listener only serves those subscribers and the replica is never ``live``.
+"""
+import asyncio
+import logging
+from typing import Callable, NamedTuple, Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import engine
+
+logger = logging.getLogger(__name__)
+
+COURSE_CHANNEL = "course_changes"
+RECONNECT_SECONDS = 1.0
+_RELOAD = "*"
+
+
+class CourseMeta(NamedTuple):
+    is_active: bool
+    capacity: int
+
+
+_VERSION_SQL = "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM catalog_version_seq"
+
+
+async def notify_course_change(db: AsyncSession, course_id: Optional[UUID] = None) -> None:
+    """Tell every worker that a course (all courses when None) changed.
+
+    Call inside the writing transaction, before it commits: the notification
+    is delivered on commit and dropped on rollback.
+    """
+    payload = str(course_id) if course_id is not None else _RELOAD
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": COURSE_CHANNEL, "payload": payload})
+
+
+def _listener_dsn() -> str:
+    # Same server and credentials as the primary engine, but a plain asyncpg DSN
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class CourseReplica:
+    def __init__(self):
+        self.version = 0
+        self._courses: dict[UUID, CourseMeta] = {}
+        self._live = False
+        self._reload_pending = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loaded: Optional[asyncio.Event] = None
+        self._subscribers: dict[str, Callable[[Optional[str]], None]] = {}
+        self._replicate = True
+
+    @property
+    def live(self) -> bool:
+        return self._live
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+    def subscribe(self, channel: str, callback: Callable[[Optional[str]], None]) -> None:
+        """Also LISTEN on ``channel``; call before ``start``.
+
+        ``callback`` gets each payload, and None after every (re)connect since
+        notifications sent while disconnected are lost.
+        """
+        self._subscribers[channel] = callback
+
+    async def start(self, timeout: float, replicate: bool = True) -> None:
+        """Start listening and wait (up to ``timeout``) for the first full load."""
+        self._replicate = replicate
+        self._queue = asyncio.Queue()
+        self._loaded = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="course-replica")
+        try:
+            await asyncio.wait_for(self._loaded.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Course replica listener not ready after %.0fs; enrollments check the database", timeout)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+        self._live = False
+
+    async def lookup(self, db: AsyncSession, course_id: UUID) -> Optional[CourseMeta]:
+        """Metadata of a course, or None if it does not exist; only meaningful while ``live``."""
+        course = self._courses.get(course_id)
+        if course is not None:
+            return course
+        # Miss: a course created moments ago, or no such course. One query settles both.
+        row = (
+            await db.execute(
+                text(
+                    "SELECT s.last_value, s.is_called, c.is_active, c.capacity "
+                    "FROM catalog_version_seq s LEFT JOIN courses c ON c.id = :course_id"
+                ),
+                {"course_id": course_id},
+            )
+        ).one()
+        version = row.last_value if row.is_called else 0
+        # The version is read after the change notifications are handled, so newer means missed
+        if version > self.version:
+            self._request(_RELOAD)
+        if row.is_active is None:
+            return None
+        return CourseMeta(row.is_active, row.capacity)
+
+    def _request(self, target) -> None:
+        if self._queue is None:
+            return
+        if target == _RELOAD:
+            # Misses during a burst of catalog writes would otherwise queue one reload each
+            if self._reload_pending:
+                return
+            self._reload_pending = True
+        self._queue.put_nowait(target)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self._request(payload)
+
+    def _on_connection_lost(self, connection) -> None:
+        self._live = False
+        self._request(None)
+
+    async def _reload(self, conn: asyncpg.Connection) -> None:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            # One snapshot: the version matches the rows
+            version = await conn.fetchval(_VERSION_SQL)
+            rows = await conn.fetch("SELECT id, is_active, capacity FROM courses")
+        self._courses = {row["id"]: CourseMeta(row["is_active"], row["capacity"]) for row in rows}
+        self.version = version
+
+    async def _refresh(self, conn: asyncpg.Connection, course_id: UUID) -> None:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            version = await conn.fetchval(_VERSION_SQL)
+            row = await conn.fetchrow("SELECT is_active, capacity FROM courses WHERE id = $1", course_id)
+        if row is None:
+            self._courses.pop(course_id, None)
+        else:
+            self._courses[course_id] = CourseMeta(row["is_active"], row["capacity"])
+        self.version = max(self.version, version)
+
+    async def _listen(self, conn: asyncpg.Connection) -> None:
+        if self._replicate:
+            await conn.add_listener(COURSE_CHANNEL, self._on_notification)
+        for channel, callback in self._subscribers.items():
+            await conn.add_listener(channel, lambda _conn, _pid, _channel, payload, cb=callback: cb(payload))
+            callback(None)
+        conn.add_termination_listener(self._on_connection_lost)
+        if self._replicate:
+            # Reload after LISTEN so no change falls between the two
+            await self._reload(conn)
+            self._live = True
+            logger.info("Course replica loaded %d courses at catalog version %d", len(self._courses), self.version)
+        self._loaded.set()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if item == _RELOAD:
+                self._reload_pending = False
+                await self._reload(conn)
+            else:
+                await self._refresh(conn, UUID(item))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Outside the pools: LISTEN holds its connection for the worker's lifetime
+                conn = await asyncpg.connect(_listener_dsn())
+                try:
+                    await self._listen(conn)
+                finally:
+                    await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Course replica listener failed; retrying")
+            self._live = False
+            await asyncio.sleep(RECONNECT_SECONDS)
+            # Drop requests queued for the lost connection; the next load covers them
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._reload_pending = False
+
+
+course_replica = CourseReplica()
@@ -0,0 +1,37 @@
+"""Lean JSON responses for large list endpoints.
+
+The default path loads ORM instances, validates each one again through the
+``response_model`` and then encodes the result. List endpoints that select
+exactly the response columns can instead hand the rows to ``rows_response``,
+which encodes them straight to bytes with orjson. The route keeps its
+``response_model`` for the OpenAPI schema, and the column select stands in
+for the validation, so the two must be kept in step.
+"""
+from typing import Iterable, Optional
+
+import orjson
+from fastapi import Response
+
+# UTC datetimes end in "Z", as pydantic renders them on the default path
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def rows_response(rows: Iterable, response: Optional[Response] = None) -> ORJSONResponse:
+    """Encode result rows as a JSON array of objects keyed by column label.
+
+    Returning a Response bypasses FastAPI's handling of the injected
+    ``response``, so headers set on it (cursor, ETag) are carried over.
+    """
+    lean = ORJSONResponse([row._asdict() for row in rows])
+    if response is not None:
+        lean.headers.raw.extend(
+            (name, value) for name, value in response.headers.raw if name != b"content-length"
+        )
+    return lean
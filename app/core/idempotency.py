@@ -0,0 +1,335 @@
+"""Idempotency-Key support for retried POSTs.
+
+A client that sends ``Idempotency-Key`` gets the original status and body
+back when it retries, without the endpoint running again. Keys are scoped to
+the route and the bearer token subject; anonymous keys (registration) are
+also scoped to the request body, so unrelated callers never share them.
+Results are remembered for ``idempotency_ttl_seconds`` in the
+``idempotency_keys`` table, with recent ones also kept in process memory.
+
+The first request claims the key with an insert. A duplicate that arrives
+while the first is still running waits for it instead of racing it: on the
+same worker through an in-process future, on other workers by polling the
+row. Until it completes, a claim only holds a lease of
+``idempotency_lease_seconds`` (its ``expires_at``), so a claim left behind
+by a crashed worker or a failed ``complete``/``abandon`` is taken over by
+the next retry instead of blocking the key for the whole TTL. Responses with
+a 5xx status are not recorded, so those retries run again.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings, engine
+from app.core.security import bearer_subject
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.05
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class StoredResponse:
+    __slots__ = ("request_hash", "status_code", "content_type", "body")
+
+    def __init__(self, request_hash: str, status_code: int, content_type: Optional[str], body: bytes):
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a request with a different body."""
+
+
+class IdempotencyTimeout(Exception):
+    """The first execution of the key did not finish within the wait time."""
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: int, wait_seconds: float, cache_size: int, lease_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.lease_seconds = lease_seconds
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], tuple[float, StoredResponse]] = OrderedDict()
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        self._purged_at = time.monotonic()
+
+    async def begin(self, scope: str, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """Return the response to replay, or None when the caller owns the execution.
+
+        An owner must finish with ``complete`` or ``abandon``.
+        """
+        cache_key = (scope, key)
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            stored = self._cache_get(cache_key)
+            if stored is not None:
+                return self._check(stored, request_hash)
+
+            future = self._in_flight.get(cache_key)
+            if future is not None:
+                # Same worker: wait on the first execution, then look again
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    raise IdempotencyTimeout()
+                continue
+
+            # Registered before the first await so later local duplicates find it
+            self._in_flight[cache_key] = asyncio.get_running_loop().create_future()
+            try:
+                claimed = await self._claim(scope, key, request_hash)
+                row = None if claimed else await self._fetch(scope, key)
+            except BaseException:
+                self._release(cache_key, None)
+                raise
+            if claimed:
+                return None
+            self._release(cache_key, None)
+
+            if row is not None and row.status_code is not None:
+                stored = StoredResponse(row.request_hash, row.status_code, row.content_type, row.response_body)
+                self._cache_put(cache_key, stored)
+                return self._check(stored, request_hash)
+            if row is not None and row.request_hash != request_hash:
+                raise IdempotencyKeyMismatch()
+            # Another worker is running it (or gave up and deleted the claim): poll
+            if time.monotonic() >= deadline:
+                raise IdempotencyTimeout()
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def complete(self, scope: str, key: str, stored: StoredResponse) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        try:
+            async with engine.begin() as conn:
+                # Only while our claim is unfinished; a lapsed lease may have been taken over
+                await conn.execute(
+                    update(IdempotencyKey)
+                    .where(
+                        IdempotencyKey.scope == scope,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.request_hash == stored.request_hash,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                    .values(
+                        status_code=stored.status_code, content_type=stored.content_type,
+                        response_body=stored.body, expires_at=expires_at,
+                    )
+                )
+                # Expired records are also taken over on claim; this just keeps the table small
+                if time.monotonic() - self._purged_at > PURGE_INTERVAL_SECONDS:
+                    self._purged_at = time.monotonic()
+                    await conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now()))
+            self._cache_put((scope, key), stored)
+        finally:
+            # Local duplicates re-check the cache, or claim again if recording failed
+            self._release((scope, key), stored)
+
+    async def abandon(self, scope: str, key: str) -> None:
+        """Forget a claim whose execution failed, so a retry runs again."""
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.scope == scope,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                )
+        finally:
+            self._release((scope, key), None)
+
+    async def _claim(self, scope: str, key: str, request_hash: str) -> bool:
+        # A lease, not the replay TTL: complete() sets that
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+        stmt = pg_insert(IdempotencyKey).values(
+            scope=scope, key=key, request_hash=request_hash, expires_at=expires_at,
+        )
+        # An expired record or a lapsed lease is taken over as if it did not exist
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": None,
+                "content_type": None,
+                "response_body": None,
+                "created_at": func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now(),
+        ).returning(IdempotencyKey.key)
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt)
+            return result.first() is not None
+
+    async def _fetch(self, scope: str, key: str):
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(
+                    IdempotencyKey.request_hash, IdempotencyKey.status_code,
+                    IdempotencyKey.content_type, IdempotencyKey.response_body,
+                ).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            )
+            return result.first()
+
+    def _release(self, cache_key: tuple[str, str], stored: Optional[StoredResponse]) -> None:
+        future = self._in_flight.pop(cache_key, None)
+        if future is not None and not future.done():
+            future.set_result(stored)
+
+    @staticmethod
+    def _check(stored: StoredResponse, request_hash: str) -> StoredResponse:
+        if stored.request_hash != request_hash:
+            raise IdempotencyKeyMismatch()
+        return stored
+
+    def _cache_get(self, cache_key: tuple[str, str]) -> Optional[StoredResponse]:
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, stored = entry
+        if expires_at < time.monotonic():
+            del self._cache[cache_key]
+            return None
+        return stored
+
+    def _cache_put(self, cache_key: tuple[str, str], stored: StoredResponse) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[cache_key] = (time.monotonic() + self.ttl_seconds, stored)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    wait_seconds=settings.idempotency_wait_seconds,
+    cache_size=settings.idempotency_cache_size,
+    lease_seconds=settings.idempotency_lease_seconds,
+)
+
+
+def default_idempotent_routes() -> set[tuple[str, str]]:
+    return {("POST", "/enrollments/"), ("POST", "/auth/register")}
+
+
+class IdempotencyMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Optional[set[tuple[str, str]]] = None,
+        store: Optional[IdempotencyStore] = None,
+    ):
+        self.app = app
+        self.routes = routes if routes is not None else default_idempotent_routes()
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        key = dict(scope.get("headers", ())).get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, 400, "Invalid Idempotency-Key")
+            return
+
+        body = await self._read_body(receive)
+        request_hash = hashlib.sha256(body).hexdigest()
+        subject = bearer_subject(scope)
+        # Anonymous callers share no identity, so the body keeps their keys apart
+        key_scope = f"{scope['method']} {scope['path']}|{subject if subject else 'anon:' + request_hash}"
+        try:
+            stored = await self.store.begin(key_scope, key, request_hash)
+        except IdempotencyKeyMismatch:
+            await self._error(scope, receive, send, 422, "Idempotency-Key was used with a different request")
+            return
+        except IdempotencyTimeout:
+            await self._error(scope, receive, send, 409, "A request with this Idempotency-Key is still in progress",
+                              {"Retry-After": "1"})
+            return
+        if stored is not None:
+            await self._replay(stored, send)
+            return
+        await self._execute(scope, receive, send, body, key_scope, key, request_hash)
+
+    async def _execute(self, scope: Scope, receive: Receive, send: Send, body: bytes,
+                       key_scope: str, key: str, request_hash: str) -> None:
+        status_code = 500
+        content_type: Optional[str] = None
+        chunks: list[bytes] = []
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            # The body was consumed to fingerprint it; hand it to the app once
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            await self.store.abandon(key_scope, key)
+            raise
+        if status_code >= 500:
+            await self.store.abandon(key_scope, key)
+        else:
+            await self.store.complete(key_scope, key, StoredResponse(request_hash, status_code, content_type, b"".join(chunks)))
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send: Send) -> None:
+        headers = [
+            (b"content-length", str(len(stored.body)).encode()),
+            (b"idempotent-replayed", b"true"),
+        ]
+        if stored.content_type:
+            headers.append((b"content-type", stored.content_type.encode("latin-1")))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str,
+                     headers: Optional[dict] = None) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+        await response(scope, receive, send)
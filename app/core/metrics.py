@@ -0,0 +1,296 @@
+"""Prometheus-format metrics.
+
+A small in-process registry (counters, gauges, histograms) rendered in the
+Prometheus text exposition format on ``/metrics``. Covers per-route request
+latency and in-flight requests, per-request SQL counts and time via engine
+events, connection-pool telemetry and time spent in bcrypt.
+"""
+import contextvars
+import time
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self):
+        for key, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {child.value}"
+
+
+class Gauge(_Metric):
+    """Gauge whose value is either set directly or pulled from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect: Optional[Callable[[], dict]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self):
+        if self._collect is not None:
+            for key, value in self._collect().items():
+                self.labels(*key).set(value)
+        for key, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {child.value}"
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _samples(self):
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (repr(float(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            yield f"{self.name}_bucket{labels} {child.count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {child.sum}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {child.count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled by route.", ("method", "route")))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS))
+http_request_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ("method", "route")))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("pool",)))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("pool",)))
+bcrypt_duration = registry.register(Histogram(
+    "bcrypt_duration_seconds", "bcrypt hash/verify time including executor queueing.", ("operation",)))
+bcrypt_rejected = registry.register(Counter(
+    "bcrypt_rejected_total", "bcrypt calls rejected because the executor was saturated.", ("operation",)))
+
+# name -> engine, read by the pool gauges at scrape time
+_engines: dict[str, AsyncEngine] = {}
+
+
+def _pool_stat(getter: Callable) -> Callable[[], dict]:
+    def collect():
+        return {(name,): getter(engine.pool) for name, engine in _engines.items()}
+    return collect
+
+
+registry.register(Gauge("db_pool_checked_out", "Connections currently checked out.", ("pool",),
+                        collect=_pool_stat(lambda pool: pool.checkedout())))
+registry.register(Gauge("db_pool_overflow", "Overflow connections currently open.", ("pool",),
+                        collect=_pool_stat(lambda pool: max(pool.overflow(), 0))))
+registry.register(Gauge("db_pool_size", "Configured pool size.", ("pool",),
+                        collect=_pool_stat(lambda pool: pool.size())))
+
+
+class RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: contextvars.ContextVar[Optional[RequestDbStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Attach query timing events and register the engine's pool for the gauges."""
+    _engines[name] = engine
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics_name = name
+    query_duration = db_query_duration.labels(name)
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        query_duration.observe(elapsed)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+def route_label(scope: Scope) -> str:
+    """Route template for ``scope``, e.g. ``/courses/{course_id}``.
+
+    Included routers may only expose the template relative to their prefix,
+    so the prefix is recovered from the concrete path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    parts = scope["path"].split("/")
+    prefix = "/".join(parts[:max(len(parts) - template.count("/"), 0)])
+    return prefix + template
+
+
+async def track_in_flight(request: Request):
+    """App-level dependency: the route is only known after routing, so the
+    in-flight gauge is maintained here rather than in the middleware."""
+    gauge = http_requests_in_flight.labels(request.method, route_label(request.scope))
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db_stats.reset(token)
+            method, route = scope["method"], route_label(scope)
+            http_request_duration.labels(method, route, status).observe(elapsed)
+            http_request_db_queries.labels(method, route).observe(stats.queries)
+            http_request_db_seconds.labels(method, route).observe(stats.seconds)
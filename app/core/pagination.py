@@ -0,0 +1,86 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by ``(sort column, id)`` and the next page starts strictly
+after the last row of the current one, so page N costs the same as page 1
+when a matching composite index exists.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(stmt: Select, sort_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """Order ``stmt`` by the keyset and fetch one extra row to detect a next page."""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(sort_column, id_column) > tuple_(sort_value, row_id))
+    return stmt.order_by(sort_column, id_column).limit(limit + 1)
+
+
+def next_cursor(rows: list, sort_key: str, limit: int, id_key: str = "id") -> Optional[str]:
+    """Cursor for the page after ``rows``; trims the extra row in place."""
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_key), getattr(last, id_key))
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    response: Optional[Response] = None,
+) -> list:
+    """Run a keyset-paginated ORM query and expose the next cursor as a header."""
+    result = await db.execute(apply_keyset(stmt, sort_column, id_column, cursor, limit))
+    return _finish_page(list(result.scalars().all()), sort_column, id_column, limit, response)
+
+
+async def keyset_rows(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    response: Optional[Response] = None,
+) -> list:
+    """Like keyset_page for column selects: returns plain rows, no ORM instances.
+
+    ``stmt`` must select the sort and id columns under their own names.
+    """
+    result = await db.execute(apply_keyset(stmt, sort_column, id_column, cursor, limit))
+    return _finish_page(list(result.all()), sort_column, id_column, limit, response)
+
+
+def _finish_page(rows: list, sort_column, id_column, limit: int, response: Optional[Response]) -> list:
+    cursor_out = next_cursor(rows, sort_column.key, limit, id_column.key)
+    if response is not None and cursor_out:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
+    return rows
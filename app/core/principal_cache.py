@@ -0,0 +1,152 @@
+"""In-process cache of authenticated principals.
+
+Removes the per-request ``users`` lookup in ``get_current_user``. Entries are
+keyed by the token subject (email) and bounded by size and TTL. Tokens may
+also carry signed ``uid``/``role``/``act`` claims that role checks can trust
+for a short window without touching the database.
+
+A change to a user's ``is_active``, ``role`` or ``email`` invalidates the
+subject once it commits, here and, via ``NOTIFY principal_changes`` sent in
+the same transaction, in every other worker (received on the course
+replica's listener connection, which runs whether or not
+``course_replica_enabled`` is set). While that listener is down, other
+workers can serve a changed user for at most ``principal_cache_ttl_seconds``
+(cache) or ``principal_claims_max_age_seconds`` (token claims).
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User, Role
+
+PRINCIPAL_CHANNEL = "principal_changes"
+_PENDING_KEY = "principal_invalidations"
+
+_SNAPSHOT_COLUMNS = [c.key for c in User.__table__.columns if c.key != "hashed_password"]
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int, ttl_seconds: float, claims_max_age_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.claims_max_age_seconds = claims_max_age_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # subject -> time of last invalidation, so older claims are not trusted
+        self._invalidated: dict[str, float] = {}
+
+    def get(self, subject: str) -> Optional[User]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            return None
+        self._entries.move_to_end(subject)
+        # Hand out a fresh transient instance so requests never share state
+        return User(**values)
+
+    def put(self, user: User) -> None:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        values = {key: getattr(user, key) for key in _SNAPSHOT_COLUMNS}
+        self._entries[user.email] = (time.monotonic() + self.ttl_seconds, values)
+        self._entries.move_to_end(user.email)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        self._entries.pop(subject, None)
+        now = time.time()
+        self._invalidated[subject] = now
+        # Claims older than the max age are never trusted, so older marks are moot
+        cutoff = now - self.claims_max_age_seconds
+        for key in [k for k, t in self._invalidated.items() if t < cutoff]:
+            del self._invalidated[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+
+    def on_notification(self, subject: Optional[str]) -> None:
+        """Handle a ``principal_changes`` payload; None means notifications may have been missed."""
+        if subject is not None:
+            self.invalidate(subject)
+            return
+        # Keep the invalidation marks, drop entries that may predate a missed change
+        self._entries.clear()
+
+    def from_claims(self, payload: dict) -> Optional[User]:
+        """Build a principal from signed token claims if they are still fresh.
+
+        Only ``id``, ``email``, ``role`` and ``is_active`` are populated.
+        """
+        if self.claims_max_age_seconds <= 0:
+            return None
+        subject = payload.get("sub")
+        issued_at = payload.get("iat")
+        if subject is None or issued_at is None or "uid" not in payload or "role" not in payload:
+            return None
+        if issued_at < time.time() - self.claims_max_age_seconds:
+            return None
+        if self._invalidated.get(subject, 0) >= issued_at:
+            return None
+        try:
+            return User(
+                id=UUID(payload["uid"]),
+                email=subject,
+                role=Role(payload["role"]),
+                is_active=bool(payload.get("act", True)),
+            )
+        except ValueError:
+            return None
+
+
+def principal_claims(user: User) -> dict:
+    """Claims to embed in access tokens for the DB-free role checks."""
+    return {"uid": str(user.id), "role": user.role.value, "act": bool(user.is_active)}
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    claims_max_age_seconds=settings.principal_claims_max_age_seconds,
+)
+
+
+def _changed(connection, target, subjects) -> None:
+    # Runs at flush: tell the other workers on commit, and this one after commit
+    for subject in subjects:
+        connection.execute(text("SELECT pg_notify(:channel, :subject)"), {"channel": PRINCIPAL_CHANNEL, "subject": subject})
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(subjects)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in ("is_active", "role", "email")):
+        _changed(connection, target, {target.email, *(state.attrs.email.history.deleted or ())})
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    _changed(connection, target, {target.email})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # After, not at flush: a request reading between flush and commit would cache the old row again
+    for subject in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
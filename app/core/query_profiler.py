@@ -0,0 +1,135 @@
+"""Request-scoped SQL profiler.
+
+Records every statement executed while a profile is active: count, duration
+and SQL text. The middleware opens one profile per request, logs slow
+statements and repeated identical statements (likely N+1 patterns), and can
+report the totals in an ``X-DB-Queries`` header. ``assert_max_queries`` uses
+the same machinery to enforce query budgets in tests.
+"""
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|%\([^)]+\)s|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace literals and bind markers with ``?``."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _LITERALS.sub("?", normalized)
+    return _IN_LIST.sub("(?)", normalized)
+
+
+class QueryProfile:
+    def __init__(self):
+        self.statements: list[tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Normalized statements executed at least ``threshold`` times."""
+        if self.count < threshold:
+            return []
+        counts = Counter(normalize_sql(statement) for statement, _ in self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        return "\n".join(
+            f"  {index}. [{duration * 1000:.1f} ms] {normalize_sql(statement)}"
+            for index, (statement, duration) in enumerate(self.statements, 1)
+        )
+
+
+# Active profiles; nested profiles (a test around a request) all record
+_active_profiles: contextvars.ContextVar[tuple[QueryProfile, ...]] = contextvars.ContextVar(
+    "active_query_profiles", default=())
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    profile = QueryProfile()
+    token = _active_profiles.set(_active_profiles.get() + (profile,))
+    try:
+        yield profile
+    finally:
+        _active_profiles.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryProfile]:
+    """Fail if the block executes more than ``limit`` SQL statements."""
+    with profile_queries() as profile:
+        yield profile
+    if profile.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} queries, {profile.count} were executed:\n{profile.report()}"
+        )
+
+
+def install_query_profiler(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active_profiles.get():
+            conn.info.setdefault("profiler_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profiles = _active_profiles.get()
+        starts = conn.info.get("profiler_start_time")
+        if not profiles or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        for profile in profiles:
+            profile.statements.append((statement, elapsed))
+        if elapsed * 1000 >= settings.slow_query_ms:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, normalize_sql(statement))
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.query_debug_header:
+                    headers = list(message.get("headers", []))
+                    value = f"{profile.count}; {profile.total_seconds * 1000:.1f}ms"
+                    headers.append((b"x-db-queries", value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for sql, times in profile.repeated(settings.n_plus_one_threshold):
+            logger.warning(
+                "Possible N+1 on %s %s: %d identical statements: %s",
+                scope["method"], route_label(scope), times, sql,
+            )
@@ -0,0 +1,94 @@
+"""Routing of read-only sessions to replicas.
+
+Replicas are used round-robin. A replica that fails with a connection error
+is skipped for ``replica_retry_seconds``; while none is healthy (or none is
+configured) read sessions fall back to the primary.
+
+Read sessions check out their connection lazily, on the first statement, like
+any other session. If a replica fails right there, the statement is re-run on
+the primary, so the request that finds a replica down does not fail; a
+connection error later in the session only marks the replica down.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+from app.core.config import settings, engine, AsyncSessionLocal, ReadSessionLocals
+
+# session.info key holding ``(router, replica index)`` of a replica read session
+_ROUTE = "read_route"
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    if isinstance(exc, (OperationalError, InterfaceError, OSError, TimeoutError)):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+class ReplicaSession(Session):
+    """Sync session behind replica read sessions; see ``_fall_back_to_primary``."""
+
+
+class ReplicaRouter:
+    def __init__(self, session_factories: list, retry_seconds: float):
+        self._session_factories = session_factories
+        self._down_until = [0.0] * len(session_factories)
+        self._next = 0
+        self.retry_seconds = retry_seconds
+
+    def pick(self) -> tuple[Optional[int], sessionmaker]:
+        """Return ``(replica index, session factory)``; index is None for the primary."""
+        now = time.monotonic()
+        for _ in range(len(self._session_factories)):
+            index = self._next
+            self._next = (index + 1) % len(self._session_factories)
+            if self._down_until[index] <= now:
+                return index, self._session_factories[index]
+        return None, AsyncSessionLocal
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def session(self) -> AsyncSession:
+        """A new read session; nothing is checked out until its first statement."""
+        index, session_factory = self.pick()
+        if index is None:
+            return session_factory()
+        return session_factory(sync_session_class=ReplicaSession, info={_ROUTE: (self, index)})
+
+    def replica_failed(self, session: AsyncSession, exc: BaseException) -> None:
+        """Mark the session's replica down if ``exc`` lost its connection."""
+        route = session.info.get(_ROUTE)
+        if route is not None and is_connection_error(exc):
+            self.mark_down(route[1])
+
+
+@event.listens_for(ReplicaSession, "do_orm_execute")
+def _fall_back_to_primary(state: ORMExecuteState):
+    session = state.session
+    route = session.info.get(_ROUTE)
+    if route is None:
+        return None
+    router, index = route
+    first = not session.in_transaction()
+    try:
+        return state.invoke_statement()
+    except Exception as e:
+        if not is_connection_error(e):
+            raise
+        router.mark_down(index)
+        if not first:
+            # Rows may already have been read from the replica; the caller decides
+            raise
+    # Nothing was read from the replica yet: finish the session on the primary
+    session.rollback()
+    session.bind = engine.sync_engine
+    del session.info[_ROUTE]
+    return state.invoke_statement(bind_arguments={"bind": engine.sync_engine})
+
+
+replica_router = ReplicaRouter(ReadSessionLocals, settings.replica_retry_seconds)
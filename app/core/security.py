@@ -1,7 +1,11 @@
 from passlib.context import CryptContext
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt
+import asyncio
+import time
+from app.core.metrics import bcrypt_duration, bcrypt_rejected
+from jose import JWTError, jwt
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -22,9 +26,68 @@ def get_password_hash(password: str) -> str:
     
     return pwd_context.hash(password)
 
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt executor already has its maximum queue depth."""
+
+_hash_executor: Optional[Executor] = None
+_hash_in_flight = 0
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.password_hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="bcrypt",
+            )
+    return _hash_executor
+
+async def _run_hash_job(operation: str, func, *args):
+    # Reject immediately instead of letting a login burst queue unboundedly
+    global _hash_in_flight
+    if _hash_in_flight >= settings.password_hash_workers + settings.password_hash_max_queue:
+        bcrypt_rejected.labels(operation).inc()
+        raise PasswordHasherBusy()
+    _hash_in_flight += 1
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_in_flight -= 1
+        bcrypt_duration.labels(operation).observe(time.perf_counter() - start)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job("hash", get_password_hash, password)
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def bearer_subject(scope) -> Optional[str]:
+    """Subject of a valid bearer token in an ASGI scope, for middleware that runs before auth."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            except JWTError:
+                return None
+            return payload.get("sub")
+    return None
\ No newline at end of file
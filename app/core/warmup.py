@@ -0,0 +1,100 @@
+"""Startup warm-up, readiness and timing.
+
+A fresh worker would otherwise pay for connection setup (TLS, auth, asyncpg
+type introspection) and statement preparation on its first requests. The
+lifespan instead opens ``pool_size`` connections up front and runs the hot
+statements on each, and only then reports ready on ``/readyz``. Every
+startup phase is timed and logged as one line.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.models.user import User
+from app.services.enrollment import claim_seat
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self) -> str:
+        total = sum(seconds for _, seconds in self.phases)
+        parts = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases)
+        return f"Startup took {total * 1000:.0f}ms: {parts}"
+
+
+class Readiness:
+    """Whether this worker should receive traffic; flipped by the lifespan."""
+
+    def __init__(self):
+        self.ready = False
+
+    def mark_ready(self) -> None:
+        self.ready = True
+
+    def mark_not_ready(self) -> None:
+        self.ready = False
+
+
+startup_timer = StartupTimer()
+readiness = Readiness()
+
+
+async def _warm_session(session: AsyncSession, writable: bool) -> None:
+    await session.execute(text("SELECT 1"))
+    # Principal lookup: also introspects the user_role enum on this connection
+    await session.execute(select(User).where(User.email == ""))
+    await session.execute(text("SELECT last_value, is_called FROM catalog_version_seq"))
+    if writable:
+        # Prepares the seat-claim CTE; an unknown course rolls back without writing
+        await claim_seat(session, uuid.uuid4(), uuid.uuid4())
+    await session.rollback()
+
+
+async def warm_pool(engine: AsyncEngine, writable: bool = True) -> int:
+    """Open ``pool_size`` connections at once and run the hot statements on each."""
+    size = max(engine.pool.size(), 1)
+    # Every session holds its connection until all are open, so none is reused
+    barrier = asyncio.Barrier(size)
+
+    async def warm_one() -> None:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            try:
+                await session.connection()
+                await barrier.wait()
+            except BaseException:
+                # Release the others waiting on the barrier, or they would hold their connections forever
+                await barrier.abort()
+                raise
+            await _warm_session(session, writable)
+
+    # A failure cancels the sibling tasks
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(size):
+                group.create_task(warm_one())
+    except ExceptionGroup as failed:
+        # Raise the error that started it, not the siblings it aborted, so callers can classify it
+        errors = [e for e in failed.exceptions if not isinstance(e, asyncio.BrokenBarrierError)]
+        raise (errors or failed.exceptions)[0]
+    return size
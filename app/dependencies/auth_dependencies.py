@@ -8,6 +8,8 @@ from sqlalchemy import select
 from app.core.config import settings, AsyncSessionLocal
 from app.schemas.token import TokenData
 from app.models.user import User, Role
+from app.core.principal_cache import principal_cache
+from app.core.read_routing import replica_router
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -15,35 +17,64 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only work; may lag the primary, so never use it for read-your-writes."""
+    async with replica_router.session() as session:
+        yield session
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token,
             settings.secret_key,  # ✅ Changed to lowercase
             algorithms=[settings.algorithm],  # ✅ Changed to lowercase
         )
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+async def _load_principal(email: str, db: AsyncSession) -> User:
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
 
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
-
+        raise _credentials_exception()
+    principal_cache.put(user)
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    payload = _decode_token(token)
+    return await _load_principal(payload["sub"], db)
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Like get_current_user, but fresh signed claims skip the lookup entirely.
+
+    Only id, email, role and is_active are guaranteed to be populated.
+    """
+    payload = _decode_token(token)
+    principal = principal_cache.from_claims(payload)
+    if principal is not None:
+        return principal
+    return await _load_principal(payload["sub"], db)
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -51,15 +82,22 @@ async def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_active_principal(
+    current_user: User = Depends(get_current_principal),
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
 async def get_current_admin(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_principal),
 ) -> User:
     if current_user.role != Role.admin:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
 
 async def get_current_student(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_principal),
 ) -> User:
     if current_user.role != Role.student:
         raise HTTPException(status_code=403, detail="Not enough permissions")
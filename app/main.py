@@ -1,5 +1,8 @@
 import sys
 import asyncio
+import time
+
+_import_started = time.perf_counter()
 
 # CRITICAL: Force standard asyncio instead of uvloop for Leapcell compatibility
 # Must be before ANY other imports that might use asyncio
@@ -10,27 +13,114 @@ if 'uvloop' in sys.modules:
 asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
 
 
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Depends, Response
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from sqlalchemy import text
-from app.core.config import engine
-from app.api import auth, users, courses, enrollments
+from app.core.config import engine, read_engines, settings
+from app.core.admission import AdmissionControlMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry, track_in_flight
+from app.core.query_profiler import QueryProfilerMiddleware, install_query_profiler
+from app.core.security import shutdown_hash_executor, get_password_hash_async
+from app.core.warmup import warm_pool, startup_timer, readiness
+from app.core.read_routing import replica_router, is_connection_error
+from app.core.course_replica import course_replica
+from app.core.principal_cache import principal_cache, PRINCIPAL_CHANNEL
+from app.services.waitlist import waitlist_promoter
+from app.services.course_deletion import course_deletion_runner
+from app.api import auth, users, courses, enrollments, waitlist, analytics
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Test database connection
+    # Open and warm the whole pool so the first requests don't pay for connection setup
     try:
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
+        with startup_timer.phase("primary pool"):
+            await warm_pool(engine)
         print("Database connection successful")
     except Exception as e:
         print(f"Database connection failed: {e}")
         raise
+    for index, read_engine in enumerate(read_engines):
+        try:
+            with startup_timer.phase(f"replica{index} pool"):
+                await warm_pool(read_engine, writable=False)
+        except Exception as e:
+            # Reads fall back to the primary until the replica answers again
+            if not is_connection_error(e):
+                raise
+            logger.warning("Replica %d unavailable at startup: %s", index, e)
+            replica_router.mark_down(index)
+    with startup_timer.phase("bcrypt backend"):
+        # passlib loads and self-tests the backend on first use; don't let a login pay for it
+        await get_password_hash_async("warmup")
+    # After the pool warm-up, which relies on seat claims reaching the database
+    with startup_timer.phase("course replica"):
+        # Its listener connection also carries principal invalidations from other
+        # workers, so it runs even when the course data itself is not replicated
+        course_replica.subscribe(PRINCIPAL_CHANNEL, principal_cache.on_notification)
+        await course_replica.start(
+            settings.course_replica_load_timeout_seconds, replicate=settings.course_replica_enabled
+        )
+    waitlist_promoter.start()
+    course_deletion_runner.start()
+    readiness.mark_ready()
+    print(startup_timer.summary())
     yield
+    readiness.mark_not_ready()
+    await waitlist_promoter.stop()
+    await course_deletion_runner.stop()
+    await course_replica.stop()
+    shutdown_hash_executor()
+    for read_engine in read_engines:
+        await read_engine.dispose()
+
+instrument_engine(engine, "primary")
+install_query_profiler(engine)
+for index, read_engine in enumerate(read_engines):
+    instrument_engine(read_engine, f"replica{index}")
+    install_query_profiler(read_engine)
+
+app = FastAPI(
+    title="Course Enrollment Platform",
+    version="1.0.0",
+    lifespan=lifespan,
+    dependencies=[Depends(track_in_flight)],
+)
 
-app = FastAPI(title="Course Enrollment Platform", version="1.0.0", lifespan=lifespan)
+if settings.query_profiler_enabled:
+    app.add_middleware(QueryProfilerMiddleware)
+# Inside admission control, so shed requests never claim a key
+if settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware)
+if settings.admission_enabled:
+    app.add_middleware(AdmissionControlMiddleware)
+# Outermost, so shed requests are measured too
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    # Liveness only: never touches the database
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    # Ready once the pools are warm; not ready again while shutting down
+    if not readiness.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ready"}
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(courses.router, prefix="/courses", tags=["Courses"])
-app.include_router(enrollments.router, prefix="/enrollments", tags=["Enrollments"])
\ No newline at end of file
+app.include_router(enrollments.router, prefix="/enrollments", tags=["Enrollments"])
+app.include_router(waitlist.router, prefix="/waitlist", tags=["Waitlist"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+
+startup_timer.record("imports", time.perf_counter() - _import_started)
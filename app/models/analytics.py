@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.models.user import Base
+
+# Enrollment aggregates maintained by the enrollment write paths (see app/services/analytics.py)
+
+class CourseRoleStats(Base):
+    __tablename__ = "course_enrollment_role_stats"
+    course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String(16), primary_key=True)  # enrollments.role
+    enrolled = Column(Integer, nullable=False, default=0, server_default="0")
+
+class EnrollmentDailyStats(Base):
+    __tablename__ = "enrollment_daily_stats"
+    day = Column(Date, primary_key=True)  # UTC
+    # No foreign key: history outlives deleted courses
+    course_id = Column(UUID(as_uuid=True), primary_key=True)
+    added = Column(Integer, nullable=False, default=0, server_default="0")
+    removed = Column(Integer, nullable=False, default=0, server_default="0")
+    __table_args__ = (
+        Index('ix_enrollment_daily_stats_course_id_day', 'course_id', 'day'),
+    )
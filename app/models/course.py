@@ -1,15 +1,40 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, CheckConstraint, Index, Sequence, Computed, DDL, event, literal_column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.models.user import Base
 import uuid
 
+# Catalog version for HTTP caching (see app/core/catalog_cache.py)
+catalog_version_seq = Sequence("catalog_version_seq", metadata=Base.metadata)
+
+# Weighted full-text document for course search (see app/services/course_search.py)
+COURSE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
 class Course(Base):
     __tablename__ = "courses"
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)  # ✅ Changed to UUID
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # ✅ Changed to UUID
     code = Column(String, unique=True, index=True, nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text)
     capacity = Column(Integer, nullable=False)
+    # Seats taken, maintained by the enrollment write paths (see app/services/enrollment.py)
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Generated by Postgres; deferred so list queries never load it
+    search_vector = deferred(Column(TSVECTOR, Computed(COURSE_SEARCH_VECTOR, persisted=True)))
+    __table_args__ = (
+        CheckConstraint('enrolled_count >= 0', name='ck_courses_enrolled_count_nonnegative'),
+        Index('ix_courses_created_at_id', 'created_at', 'id'),  # keyset pagination
+        Index('ix_courses_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_courses_code_title_trgm', (code + literal_column("' '") + title).label('code_title'),
+              postgresql_using='gin', postgresql_ops={'code_title': 'gin_trgm_ops'}),  # typo-tolerant matching
+    )
+
+# The trigram index needs pg_trgm; migration 008 creates it for migrated databases
+event.listen(Course.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import enum
+import uuid
+from app.models.user import Base
+
+class CourseJobStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class CourseDeletionJob(Base):
+    __tablename__ = "course_deletion_jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # No foreign key: the job outlives the course it deletes
+    course_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String(16), nullable=False, default=CourseJobStatus.pending.value)
+    enrollments_deleted = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # A pending job that failed before is not claimed again until then
+    retry_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Bumped after every batch; a running job that stops updating is picked up again
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    __table_args__ = (
+        Index('ix_course_deletion_jobs_course_id', 'course_id'),
+        Index('ix_course_deletion_jobs_status', 'status'),
+    )
@@ -1,13 +1,29 @@
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, String, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
+import enum
 import uuid
 from app.models.user import Base
 
+class EnrollmentOutcome(str, enum.Enum):
+    enrolled = "enrolled"
+    duplicate = "duplicate"
+    full = "full"
+    inactive = "inactive"
+    course_not_found = "course_not_found"
+    user_not_found = "user_not_found"
+
 class Enrollment(Base):
     __tablename__ = "enrollments"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id"), nullable=False)
     enrolled_at = Column(DateTime(timezone=True), server_default=func.now())
-    __table_args__ = (UniqueConstraint('user_id', 'course_id', name='unique_user_course'),)
\ No newline at end of file
+    # The user's role at enrollment, for the analytics (app/services/analytics.py). Always
+    # written; nullable only so a missing user still fails on the user_id foreign key.
+    role = Column(String(16), nullable=True)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'course_id', name='unique_user_course'),
+        Index('ix_enrollments_enrolled_at_id', 'enrolled_at', 'id'),  # keyset pagination
+        Index('ix_enrollments_course_id', 'course_id'),  # per-course lookups; user_id leads unique_user_course
+    )
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+from app.models.user import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    # scope is "<METHOD> <path>|<token subject>" (or "|anon:<body hash>"), so clients cannot collide with each other
+    scope = Column(String(512), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # NULL until the first execution finishes
+    status_code = Column(Integer)
+    content_type = Column(String(255))
+    response_body = Column(LargeBinary)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # The claim's lease until status_code is set, then the end of the replay window
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.models.user import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Every token rotated from one login shares a family; reuse revokes the whole family
+    family_id = Column(UUID(as_uuid=True), nullable=False)
+    token_hash = Column(String(64), unique=True, nullable=False)  # SHA-256 hex, never the token itself
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+    __table_args__ = (
+        Index('ix_refresh_tokens_family_id', 'family_id'),
+        Index('ix_refresh_tokens_user_id', 'user_id'),
+    )
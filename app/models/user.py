@@ -14,7 +14,7 @@ class Role(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)  # ✅ Changed to UUID
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # ✅ Changed to UUID
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.models.user import Base
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'course_id', name='unique_waitlist_user_course'),
+        Index('ix_waitlist_entries_course_id_created_at_id', 'course_id', 'created_at', 'id'),  # FIFO order
+    )
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date
+from uuid import UUID
+
+class CourseFillRate(BaseModel):
+    course_id: UUID
+    code: str
+    title: str
+    is_active: bool
+    capacity: int
+    enrolled_count: int
+    fill_rate: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+class DailyEnrollmentStats(BaseModel):
+    day: date
+    added: int
+    removed: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CourseAnalytics(BaseModel):
+    course_id: UUID
+    roles: dict[str, int]
+    daily: list[DailyEnrollmentStats]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
@@ -23,5 +23,51 @@ class Course(CourseBase):
     id: UUID  # ✅ Changed from int to UUID to match database
     is_active: bool
     created_at: datetime  # ✅ Added created_at field
+    enrolled_count: int = 0  # maintained counter, no per-course COUNT
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    @computed_field
+    @property
+    def seats_remaining(self) -> int:
+        return max(self.capacity - self.enrolled_count, 0)
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CourseSearchResult(BaseModel):
+    id: UUID
+    code: str
+    title: str
+    capacity: int
+    enrolled_count: int
+    is_active: bool
+    rank: float
+
+    @computed_field
+    @property
+    def seats_remaining(self) -> int:
+        return max(self.capacity - self.enrolled_count, 0)
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CourseDeletionJob(BaseModel):
+    id: UUID
+    course_id: UUID
+    status: str
+    enrollments_deleted: int
+    error: Optional[str] = None
+    attempts: int = 0
+    retry_at: Optional[datetime] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CourseImportError(BaseModel):
+    row: int
+    code: Optional[str] = None
+    error: str
+
+class CourseImportReport(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: list[CourseImportError]
\ No newline at end of file
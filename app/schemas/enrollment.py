@@ -1,6 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
+from app.models.enrollment import EnrollmentOutcome
 
 class EnrollmentBase(BaseModel):
     user_id: UUID
@@ -13,4 +15,28 @@ class Enrollment(EnrollmentBase):
     id: UUID  # Changed from int to UUID
     enrolled_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class EnrollmentCourseSummary(BaseModel):
+    id: UUID
+    code: str
+    title: str
+    is_active: bool
+    capacity: int
+    enrolled_count: int
+
+class UserEnrollment(BaseModel):
+    id: UUID
+    enrolled_at: datetime
+    course: EnrollmentCourseSummary
+
+class BulkEnrollmentCreate(BaseModel):
+    items: list[EnrollmentCreate] = Field(..., min_length=1, max_length=10000)
+
+class BulkEnrollmentResult(EnrollmentBase):
+    outcome: EnrollmentOutcome
+    enrollment_id: Optional[UUID] = None
+
+class BulkEnrollmentReport(BaseModel):
+    enrolled: int
+    results: list[BulkEnrollmentResult]
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from uuid import UUID
+
+class WaitlistEntryBase(BaseModel):
+    user_id: UUID
+    course_id: UUID
+
+class WaitlistEntryCreate(WaitlistEntryBase):
+    pass
+
+class WaitlistEntry(WaitlistEntryBase):
+    id: UUID
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
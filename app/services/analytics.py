@@ -0,0 +1,149 @@
+"""Enrollment analytics.
+
+Dashboards read small aggregate tables instead of scanning ``enrollments``.
+Every enrollment write path updates them in its own transaction, just
+before it commits:
+
+* ``course_enrollment_role_stats``: current enrollments per course and the
+  role the user had when they enrolled. Each enrollment row keeps that role
+  (``enrollments.role``) and removals subtract it, so later role changes do
+  not move the counts;
+* ``enrollment_daily_stats``: enrollments added and removed per UTC day and
+  course, kept after the course itself is deleted.
+
+Fill rates come from the maintained ``courses.enrolled_count``. The writers
+already hold the course row lock, so the stats rows of a course are only
+ever updated one transaction at a time.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Date, bindparam, cast, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import CourseRoleStats, EnrollmentDailyStats
+from app.models.course import Course
+
+
+def _utc_today():
+    return cast(func.timezone("UTC", func.now()), Date)
+
+
+async def _upsert(db: AsyncSession, role_rows: list[dict], daily: dict[UUID, list[int]]) -> None:
+    role_stmt = pg_insert(CourseRoleStats).values(role_rows)
+    await db.execute(role_stmt.on_conflict_do_update(
+        index_elements=[CourseRoleStats.course_id, CourseRoleStats.role],
+        set_={"enrolled": CourseRoleStats.enrolled + role_stmt.excluded.enrolled},
+    ))
+    daily_stmt = pg_insert(EnrollmentDailyStats).values([
+        {"day": _utc_today(), "course_id": course_id, "added": added, "removed": removed}
+        for course_id, (added, removed) in sorted(daily.items())
+    ])
+    await db.execute(daily_stmt.on_conflict_do_update(
+        index_elements=[EnrollmentDailyStats.day, EnrollmentDailyStats.course_id],
+        set_={
+            "added": EnrollmentDailyStats.added + daily_stmt.excluded.added,
+            "removed": EnrollmentDailyStats.removed + daily_stmt.excluded.removed,
+        },
+    ))
+
+
+async def record_enrollment_change(db: AsyncSession, course_id: UUID, role: str, delta: int) -> None:
+    """Count one enrollment (``delta=1``) or deregistration (``delta=-1``) of an
+    enrollment with this ``enrollments.role``; the caller commits."""
+    await _upsert(
+        db,
+        [{"course_id": course_id, "role": role, "enrolled": delta}],
+        {course_id: [max(delta, 0), max(-delta, 0)]},
+    )
+
+
+async def record_enrollment_counts(db: AsyncSession, counts: dict[tuple[UUID, str], int]) -> None:
+    """Apply signed ``(course_id, role) -> change`` counts; the caller commits."""
+    counts = {key: change for key, change in counts.items() if change}
+    if not counts:
+        return
+    daily: dict[UUID, list[int]] = defaultdict(lambda: [0, 0])
+    for (course_id, _), change in counts.items():
+        daily[course_id][0 if change > 0 else 1] += abs(change)
+    await _upsert(
+        db,
+        [{"course_id": course_id, "role": role, "enrolled": change}
+         for (course_id, role), change in sorted(counts.items())],
+        daily,
+    )
+
+
+# Same backfill as migrations 012 and 014, limited to the given courses
+_COURSE_IDS = bindparam("course_ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+_CLEAR_ROLE_STATS = text(
+    "DELETE FROM course_enrollment_role_stats WHERE course_id = ANY(:course_ids)"
+).bindparams(_COURSE_IDS)
+_CLEAR_DAILY_STATS = text(
+    "DELETE FROM enrollment_daily_stats WHERE course_id = ANY(:course_ids)"
+).bindparams(_COURSE_IDS)
+_BACKFILL_ROLE_STATS = text(
+    "INSERT INTO course_enrollment_role_stats (course_id, role, enrolled) "
+    "SELECT course_id, role, count(*) FROM enrollments "
+    "WHERE course_id = ANY(:course_ids) GROUP BY course_id, role"
+).bindparams(_COURSE_IDS)
+_BACKFILL_DAILY_STATS = text(
+    "INSERT INTO enrollment_daily_stats (day, course_id, added, removed) "
+    "SELECT (coalesce(enrolled_at, now()) AT TIME ZONE 'UTC')::date AS day, course_id, count(*), 0 "
+    "FROM enrollments WHERE course_id = ANY(:course_ids) GROUP BY 1, course_id"
+).bindparams(_COURSE_IDS)
+
+
+async def rebuild_course_stats(conn, course_ids: list[UUID]) -> None:
+    """Recompute the aggregates of these courses from ``enrollments``; the caller commits.
+
+    For enrollments written around the write paths, such as bulk loads. The
+    courses' removal history is lost.
+    """
+    await conn.execute(_CLEAR_ROLE_STATS, {"course_ids": course_ids})
+    await conn.execute(_CLEAR_DAILY_STATS, {"course_ids": course_ids})
+    await conn.execute(_BACKFILL_ROLE_STATS, {"course_ids": course_ids})
+    await conn.execute(_BACKFILL_DAILY_STATS, {"course_ids": course_ids})
+
+
+async def course_fill_rates(db: AsyncSession, skip: int = 0, limit: int = 100, is_active: Optional[bool] = None):
+    fill_rate = (Course.enrolled_count * 1.0 / func.nullif(Course.capacity, 0)).label("fill_rate")
+    query = select(
+        Course.id.label("course_id"), Course.code, Course.title, Course.is_active,
+        Course.capacity, Course.enrolled_count, func.coalesce(fill_rate, 0.0).label("fill_rate"),
+    )
+    if is_active is not None:
+        query = query.where(Course.is_active.is_(is_active))
+    result = await db.execute(
+        query.order_by(fill_rate.desc().nulls_last(), Course.id).offset(skip).limit(limit)
+    )
+    return result.all()
+
+
+async def role_breakdown(db: AsyncSession, course_id: Optional[UUID] = None) -> dict[str, int]:
+    query = select(CourseRoleStats.role, func.sum(CourseRoleStats.enrolled)).group_by(CourseRoleStats.role)
+    if course_id is not None:
+        query = query.where(CourseRoleStats.course_id == course_id)
+    return {role: int(total) for role, total in await db.execute(query) if total}
+
+
+async def daily_enrollments(db: AsyncSession, days: int, course_id: Optional[UUID] = None):
+    """Per-day totals for the last ``days`` UTC days, oldest first; days without changes are omitted."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    query = (
+        select(
+            EnrollmentDailyStats.day,
+            func.sum(EnrollmentDailyStats.added).label("added"),
+            func.sum(EnrollmentDailyStats.removed).label("removed"),
+        )
+        .where(EnrollmentDailyStats.day >= since)
+        .group_by(EnrollmentDailyStats.day)
+        .order_by(EnrollmentDailyStats.day)
+    )
+    if course_id is not None:
+        query = query.where(EnrollmentDailyStats.course_id == course_id)
+    result = await db.execute(query)
+    return result.all()
@@ -0,0 +1,249 @@
+"""Background course deletion.
+
+Deleting a course with thousands of enrollments inside the request would
+hold locks on ``enrollments`` for as long as the client waits. Instead the
+course is deactivated at once (so no new seats can be claimed) and a job
+row is recorded; an in-process runner then removes the enrollments in small
+committed batches and finally deletes the course. Job rows double as the
+status API and as the hand-off between workers: a job whose ``updated_at``
+stops moving is resumed by whichever worker sweeps it up first. A run that
+fails (say, on a transient database error) puts the job back to pending
+with a doubling ``retry_at``; only after ``course_job_max_attempts`` runs is
+it left ``failed``.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalog_cache import catalog_version
+from app.core.course_replica import notify_course_change
+from app.core.config import AsyncSessionLocal, settings
+from app.models.course import Course
+from app.models.course_job import CourseDeletionJob, CourseJobStatus
+from app.models.enrollment import Enrollment
+from app.services.analytics import record_enrollment_counts
+
+logger = logging.getLogger(__name__)
+
+_UNFINISHED = (CourseJobStatus.pending.value, CourseJobStatus.running.value)
+
+
+class CourseDeletionFailed(Exception):
+    """A deletion run failed; ``retry_in`` is the backoff in seconds, or None once attempts ran out."""
+
+    def __init__(self, job_id: UUID, retry_in: Optional[float]):
+        super().__init__(f"Course deletion job {job_id} failed")
+        self.retry_in = retry_in
+
+
+async def schedule_course_deletion(db: AsyncSession, course_id: UUID) -> Optional[CourseDeletionJob]:
+    """Deactivate the course and record a deletion job; None if the course does not exist.
+
+    Scheduling twice returns the job that is already queued.
+    """
+    deactivated = await db.execute(
+        update(Course).where(Course.id == course_id).values(is_active=False).returning(Course.id)
+    )
+    if deactivated.scalar_one_or_none() is None:
+        await db.rollback()
+        return None
+    existing = await db.execute(
+        select(CourseDeletionJob)
+        .where(CourseDeletionJob.course_id == course_id, CourseDeletionJob.status.in_(_UNFINISHED))
+    )
+    job = existing.scalars().first()
+    if job is None:
+        job = CourseDeletionJob(course_id=course_id, status=CourseJobStatus.pending.value)
+        db.add(job)
+    await notify_course_change(db, course_id)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def _claim_job(db: AsyncSession, job_id: UUID) -> Optional[UUID]:
+    stale_before = func.now() - timedelta(seconds=settings.course_job_stale_seconds)
+    result = await db.execute(
+        update(CourseDeletionJob)
+        .where(
+            CourseDeletionJob.id == job_id,
+            ((CourseDeletionJob.status == CourseJobStatus.pending.value)
+             & (CourseDeletionJob.retry_at.is_(None) | (CourseDeletionJob.retry_at <= func.now())))
+            | ((CourseDeletionJob.status == CourseJobStatus.running.value) & (CourseDeletionJob.updated_at < stale_before)),
+        )
+        .values(status=CourseJobStatus.running.value, attempts=CourseDeletionJob.attempts + 1, updated_at=func.now())
+        .returning(CourseDeletionJob.course_id)
+    )
+    course_id = result.scalar_one_or_none()
+    await db.commit()
+    return course_id
+
+
+async def _delete_enrollments(db: AsyncSession, course_id: UUID, batch_size: Optional[int] = None) -> int:
+    """Delete up to ``batch_size`` enrollments of the course (all when None) and count them in the analytics."""
+    doomed = delete(Enrollment).where(Enrollment.course_id == course_id)
+    if batch_size is not None:
+        batch = select(Enrollment.id).where(Enrollment.course_id == course_id).limit(batch_size)
+        doomed = doomed.where(Enrollment.id.in_(batch.scalar_subquery()))
+    removed = doomed.returning(Enrollment.role).cte("removed")
+    # Deleted and grouped by role in one statement
+    result = await db.execute(select(removed.c.role, func.count()).group_by(removed.c.role))
+    counts = {(course_id, role): -count for role, count in result}
+    await record_enrollment_counts(db, counts)
+    return -sum(counts.values())
+
+
+async def _delete_enrollment_batch(db: AsyncSession, job_id: UUID, course_id: UUID, batch_size: int) -> int:
+    removed = await _delete_enrollments(db, course_id, batch_size)
+    if removed:
+        await db.execute(
+            update(Course)
+            .where(Course.id == course_id)
+            .values(enrolled_count=func.greatest(Course.enrolled_count - removed, 0))
+        )
+    await db.execute(
+        update(CourseDeletionJob)
+        .where(CourseDeletionJob.id == job_id)
+        .values(enrollments_deleted=CourseDeletionJob.enrollments_deleted + removed, updated_at=func.now())
+    )
+    await db.commit()
+    return removed
+
+
+async def run_course_deletion(job_id: UUID) -> bool:
+    """Run a deletion job to completion; False if another worker owns it or it is done."""
+    async with AsyncSessionLocal() as session:
+        course_id = await _claim_job(session, job_id)
+    if course_id is None:
+        return False
+
+    try:
+        batch_size = settings.course_delete_batch_size
+        while True:
+            async with AsyncSessionLocal() as session:
+                removed = await _delete_enrollment_batch(session, job_id, course_id, batch_size)
+            if removed < batch_size:
+                break
+            await asyncio.sleep(settings.course_delete_batch_pause_seconds)
+
+        async with AsyncSessionLocal() as session:
+            # The course row lock keeps seat claims out while the stragglers and the course go
+            await session.execute(select(Course.id).where(Course.id == course_id).with_for_update())
+            removed = await _delete_enrollments(session, course_id)
+            await session.execute(delete(Course).where(Course.id == course_id))
+            await session.execute(
+                update(CourseDeletionJob)
+                .where(CourseDeletionJob.id == job_id)
+                .values(
+                    status=CourseJobStatus.completed.value,
+                    enrollments_deleted=CourseDeletionJob.enrollments_deleted + removed,
+                    updated_at=func.now(),
+                    finished_at=func.now(),
+                )
+            )
+            await notify_course_change(session, course_id)
+            await session.commit()
+    except Exception as e:
+        retry_in = await _record_failure(job_id, e)
+        raise CourseDeletionFailed(job_id, retry_in) from e
+
+    # The job is done whatever happens here; without the bump, cached catalog
+    # pages stay valid until their seat-count bucket rolls over
+    try:
+        async with AsyncSessionLocal() as session:
+            await catalog_version.bump(session)
+    except Exception:
+        logger.exception("Failed to bump the catalog version after course deletion job %s", job_id)
+    return True
+
+
+async def _record_failure(job_id: UUID, error: Exception) -> Optional[float]:
+    """Put the job back to pending with a backoff, or fail it for good; returns the backoff."""
+    async with AsyncSessionLocal() as session:
+        attempts = await session.scalar(select(CourseDeletionJob.attempts).where(CourseDeletionJob.id == job_id))
+        if attempts is not None and attempts < settings.course_job_max_attempts:
+            retry_in = settings.course_job_retry_base_seconds * 2 ** (attempts - 1)
+            values = dict(status=CourseJobStatus.pending.value, retry_at=func.now() + timedelta(seconds=retry_in))
+        else:
+            retry_in = None
+            values = dict(status=CourseJobStatus.failed.value, finished_at=func.now())
+        await session.execute(
+            update(CourseDeletionJob)
+            .where(CourseDeletionJob.id == job_id)
+            .values(error=str(error), updated_at=func.now(), **values)
+        )
+        await session.commit()
+    return retry_in
+
+
+class CourseDeletionRunner:
+    """Background task that runs the deletion jobs it is notified about, one at a time."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="course-deletion-runner")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+
+    def notify(self, job_id: UUID) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def _enqueue_backlog(self) -> None:
+        # Jobs left pending or stalled by a restarted worker; claiming settles who runs them
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CourseDeletionJob.id)
+                .where(CourseDeletionJob.status.in_(_UNFINISHED))
+                .order_by(CourseDeletionJob.created_at)
+            )
+            for job_id in result.scalars():
+                self.notify(job_id)
+
+    async def _run(self) -> None:
+        try:
+            await self._enqueue_backlog()
+        except Exception:
+            logger.exception("Failed to load course deletion backlog")
+        while True:
+            try:
+                job_id = await asyncio.wait_for(self._queue.get(), timeout=settings.course_job_stale_seconds)
+            except asyncio.TimeoutError:
+                # Idle: look for jobs stalled on a worker that died
+                try:
+                    await self._enqueue_backlog()
+                except Exception:
+                    logger.exception("Failed to load course deletion backlog")
+                continue
+            try:
+                if await run_course_deletion(job_id):
+                    logger.info("Course deletion job %s completed", job_id)
+            except CourseDeletionFailed as e:
+                if e.retry_in is None:
+                    logger.exception("Course deletion job %s failed; giving up", job_id)
+                else:
+                    logger.warning("Course deletion job %s failed; retrying in %.0fs", job_id, e.retry_in, exc_info=True)
+                    # The idle sweep would also find it; this keeps short backoffs short
+                    asyncio.get_running_loop().call_later(e.retry_in, self.notify, job_id)
+            except Exception:
+                logger.exception("Course deletion job %s failed", job_id)
+
+
+course_deletion_runner = CourseDeletionRunner()
@@ -0,0 +1,107 @@
+"""Bulk course import.
+
+Rows are validated in one pass, duplicate codes are detected within the
+batch, and valid rows are written in large batches inside one transaction.
+Codes that already exist are settled by the insert itself (ON CONFLICT), so
+a course created concurrently is reported as a row error rather than
+failing the whole import.
+"""
+import csv
+import enum
+import io
+
+from pydantic import ValidationError
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.course_replica import notify_course_change
+from app.models.course import Course
+from app.schemas.course import CourseCreate
+from app.services.waitlist import waitlist_promoter
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class ImportMode(str, enum.Enum):
+    insert = "insert"  # existing codes are reported as errors
+    upsert = "upsert"  # existing codes are updated in place
+
+
+def parse_csv_rows(content: str) -> list[dict]:
+    rows = []
+    for row in csv.DictReader(io.StringIO(content)):
+        # Empty cells mean "not provided" so optional fields keep their defaults
+        rows.append({key: value for key, value in row.items() if key and value not in (None, "")})
+    return rows
+
+
+def _row_error(index: int, code, message: str) -> dict:
+    return {"row": index, "code": code, "error": message}
+
+
+async def import_courses(db: AsyncSession, raw_rows: list[dict], mode: ImportMode) -> dict:
+    errors = []
+    valid: list[tuple[int, CourseCreate]] = []
+    seen_codes: set[str] = set()
+    for index, raw in enumerate(raw_rows):
+        try:
+            course = CourseCreate.model_validate(raw)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append(_row_error(index, raw.get("code") if isinstance(raw, dict) else None, message))
+            continue
+        if course.code in seen_codes:
+            errors.append(_row_error(index, course.code, "Duplicate code in import"))
+            continue
+        seen_codes.add(course.code)
+        valid.append((index, course))
+
+    created = updated = 0
+    written: set[str] = set()
+    # Updated courses that may have free seats now, for the waitlist promoter
+    with_free_seats = []
+    rows = [course.dict() for _, course in valid]
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        stmt = pg_insert(Course).values(rows[start:start + IMPORT_BATCH_SIZE])
+        if mode == ImportMode.upsert:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Course.code],
+                set_={
+                    "title": stmt.excluded.title,
+                    "description": stmt.excluded.description,
+                    "capacity": stmt.excluded.capacity,
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Course.code])
+        # xmax is 0 only for rows this statement inserted
+        stmt = stmt.returning(
+            Course.id, Course.code, Course.is_active, Course.capacity, Course.enrolled_count,
+            (literal_column("xmax") == 0).label("inserted"),
+        )
+        for row in await db.execute(stmt):
+            written.add(row.code)
+            if row.inserted:
+                created += 1
+            else:
+                updated += 1
+                if row.is_active and row.enrolled_count < row.capacity:
+                    with_free_seats.append(row.id)
+    if written:
+        await notify_course_change(db)
+    await db.commit()
+
+    for index, course in valid:
+        if course.code not in written:
+            errors.append(_row_error(index, course.code, "Course code already exists"))
+    for course_id in with_free_seats:
+        waitlist_promoter.notify(course_id)
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "created": created,
+        "updated": updated,
+        "failed": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,52 @@
+"""Course search.
+
+Matches ``code``, ``title`` and ``description`` through the generated
+``search_vector`` column (weighted full-text, GIN-indexed) and falls back to
+trigram word similarity on ``code || ' ' || title`` so that typos still
+find the course. Both predicates are served by GIN indexes, so the cost
+follows the number of matches rather than the size of the catalog.
+"""
+from typing import Optional
+
+from sqlalchemy import func, literal, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.course import Course
+
+SEARCH_CONFIG = "english"
+
+
+def _search_statement(query: str, is_active: Optional[bool], available_only: bool):
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    # Spelled exactly like the ix_courses_code_title_trgm expression so the planner can use it
+    code_title = (Course.code + literal_column("' '") + Course.title).self_group()
+    # Full-text rank (normalized into [0, 1)) plus trigram similarity of the query to code/title
+    rank = (func.ts_rank_cd(Course.search_vector, ts_query, 32) + func.word_similarity(query, code_title)).label("rank")
+    stmt = (
+        select(
+            Course.id, Course.code, Course.title, Course.capacity,
+            Course.enrolled_count, Course.is_active, rank,
+        )
+        .where(or_(Course.search_vector.op("@@")(ts_query), literal(query).op("<%")(code_title)))
+        .order_by(rank.desc(), Course.id)
+    )
+    if is_active is not None:
+        stmt = stmt.where(Course.is_active.is_(is_active))
+    if available_only:
+        stmt = stmt.where(Course.is_active.is_(True), Course.enrolled_count < Course.capacity)
+    return stmt
+
+
+async def search_courses(
+    db: AsyncSession,
+    query: str,
+    *,
+    is_active: Optional[bool] = None,
+    available_only: bool = False,
+    limit: int = 20,
+    offset: int = 0,
+) -> list:
+    """Ranked matches for ``query``, best first, without description blobs."""
+    stmt = _search_statement(query, is_active, available_only).limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    return list(result.all())
@@ -0,0 +1,252 @@
+"""Enrollment engine.
+
+Seat claims and releases are each a single conditional statement against
+``courses.enrolled_count`` so the capacity check and the write are atomic.
+Claims for missing or inactive courses are turned away by the in-process
+course replica (app/core/course_replica.py) before any statement runs.
+"""
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import String, cast, select, update, insert, delete, literal, bindparam
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.course_replica import course_replica
+from app.models.course import Course
+from app.models.enrollment import Enrollment, EnrollmentOutcome
+from app.models.user import User
+from app.services.analytics import record_enrollment_change, record_enrollment_counts
+
+
+def _claim_statement(user_id: UUID, course_id: UUID, enrollment_id: UUID):
+    course = (
+        select(Course.id, Course.is_active)
+        .where(Course.id == course_id)
+        .cte("course")
+    )
+    existing = (
+        select(Enrollment.id)
+        .where(Enrollment.user_id == user_id, Enrollment.course_id == course_id)
+        .cte("existing")
+    )
+    # Row lock on the course serializes concurrent claims; the WHERE clause is
+    # re-checked against the latest row version, so the counter never overshoots.
+    claimed = (
+        update(Course)
+        .where(
+            Course.id == course_id,
+            Course.is_active.is_(True),
+            Course.enrolled_count < Course.capacity,
+            ~select(existing.c.id).exists(),
+        )
+        .values(enrolled_count=Course.enrolled_count + 1)
+        .returning(Course.id)
+        .cte("claimed")
+    )
+    inserted = (
+        insert(Enrollment)
+        .from_select(
+            ["id", "user_id", "course_id", "role"],
+            select(
+                literal(enrollment_id, PG_UUID(as_uuid=True)),
+                literal(user_id, PG_UUID(as_uuid=True)),
+                claimed.c.id,
+                select(cast(User.role, String)).where(User.id == user_id).scalar_subquery(),
+            ),
+        )
+        .returning(Enrollment.id, Enrollment.enrolled_at, Enrollment.role)
+        .cte("inserted")
+    )
+    return select(
+        select(course.c.id).exists().label("course_exists"),
+        select(course.c.is_active).scalar_subquery().label("is_active"),
+        select(existing.c.id).exists().label("already_enrolled"),
+        select(inserted.c.id).scalar_subquery().label("enrollment_id"),
+        select(inserted.c.enrolled_at).scalar_subquery().label("enrolled_at"),
+        select(inserted.c.role).scalar_subquery().label("role"),
+    )
+
+
+async def claim_seat(
+    db: AsyncSession, user_id: UUID, course_id: UUID
+) -> tuple[EnrollmentOutcome, Optional[Enrollment]]:
+    """Claim a seat and insert the enrollment in one round trip.
+
+    Commits on success and rolls back otherwise. Returns the outcome and, when
+    enrolled, a detached ``Enrollment`` built from the RETURNING row.
+    """
+    if course_replica.live:
+        # The claim statement re-checks both under the row lock
+        course = await course_replica.lookup(db, course_id)
+        if course is None:
+            await db.rollback()
+            return EnrollmentOutcome.course_not_found, None
+        if not course.is_active:
+            await db.rollback()
+            return EnrollmentOutcome.inactive, None
+    try:
+        result = await db.execute(_claim_statement(user_id, course_id, uuid.uuid4()))
+        row = result.one()
+    except IntegrityError as e:
+        # A concurrent request won the unique_user_course race, or the user does
+        # not exist. The whole statement is rolled back, counter included.
+        await db.rollback()
+        if "unique_user_course" in str(e.orig):
+            return EnrollmentOutcome.duplicate, None
+        if "user_id" in str(e.orig):
+            return EnrollmentOutcome.user_not_found, None
+        raise
+
+    if row.enrollment_id is not None:
+        await record_enrollment_change(db, course_id, row.role, 1)
+        await db.commit()
+        return EnrollmentOutcome.enrolled, Enrollment(
+            id=row.enrollment_id,
+            user_id=user_id,
+            course_id=course_id,
+            enrolled_at=row.enrolled_at,
+        )
+
+    await db.rollback()
+    if not row.course_exists:
+        return EnrollmentOutcome.course_not_found, None
+    if row.already_enrolled:
+        return EnrollmentOutcome.duplicate, None
+    if not row.is_active:
+        return EnrollmentOutcome.inactive, None
+    # Either full in our snapshot or filled up while we waited on the row lock
+    return EnrollmentOutcome.full, None
+
+
+async def release_seat(
+    db: AsyncSession, enrollment_id: UUID, user_id: Optional[UUID] = None
+) -> Optional[UUID]:
+    """Delete an enrollment and give its seat back in one statement.
+
+    When ``user_id`` is given only that user's enrollment is removed. Returns
+    the course id of the released seat, or ``None`` if nothing matched.
+    """
+    removed = delete(Enrollment).where(Enrollment.id == enrollment_id)
+    if user_id is not None:
+        removed = removed.where(Enrollment.user_id == user_id)
+    removed = removed.returning(Enrollment.course_id, Enrollment.role).cte("removed")
+
+    stmt = (
+        update(Course)
+        .where(Course.id == removed.c.course_id)
+        .values(enrolled_count=Course.enrolled_count - 1)
+        .returning(Course.id, removed.c.role)
+    )
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    if row is None:
+        await db.rollback()
+        return None
+    await record_enrollment_change(db, row.id, row.role, -1)
+    await db.commit()
+    return row.id
+
+
+BULK_INSERT_BATCH_SIZE = 1000
+
+
+async def bulk_claim_seats(
+    db: AsyncSession, pairs: list[tuple[UUID, UUID]]
+) -> list[tuple[EnrollmentOutcome, Optional[UUID]]]:
+    """Enroll many ``(user_id, course_id)`` pairs with set-based validation.
+
+    Users, courses and existing enrollments are each checked with one query,
+    seats are allocated per course in request order, and rows are inserted in
+    batches. The involved course rows stay locked until the single commit, so
+    single-seat claims cannot interleave. Returns one ``(outcome,
+    enrollment_id)`` per input pair, in order.
+    """
+    user_ids = {user_id for user_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+
+    known_users = dict((await db.execute(select(User.id, User.role).where(User.id.in_(user_ids)))).tuples())
+    courses = {
+        row.id: row
+        for row in await db.execute(
+            select(Course.id, Course.is_active, Course.capacity, Course.enrolled_count)
+            .where(Course.id.in_(course_ids))
+            .order_by(Course.id)  # consistent lock order between concurrent bulk calls
+            .with_for_update()
+        )
+    }
+    already = set(
+        (
+            await db.execute(
+                select(Enrollment.user_id, Enrollment.course_id).where(
+                    Enrollment.user_id.in_(user_ids), Enrollment.course_id.in_(course_ids)
+                )
+            )
+        ).tuples()
+    )
+
+    outcomes: list[Optional[EnrollmentOutcome]] = []
+    seats_left = {cid: max(row.capacity - row.enrolled_count, 0) for cid, row in courses.items()}
+    candidates: dict[tuple[UUID, UUID], int] = {}
+    for index, pair in enumerate(pairs):
+        user_id, course_id = pair
+        course = courses.get(course_id)
+        if user_id not in known_users:
+            outcome = EnrollmentOutcome.user_not_found
+        elif course is None:
+            outcome = EnrollmentOutcome.course_not_found
+        elif not course.is_active:
+            outcome = EnrollmentOutcome.inactive
+        elif pair in already or pair in candidates:
+            outcome = EnrollmentOutcome.duplicate
+        elif seats_left[course_id] <= 0:
+            outcome = EnrollmentOutcome.full
+        else:
+            seats_left[course_id] -= 1
+            candidates[pair] = index
+            outcome = None  # decided by the insert
+        outcomes.append(outcome)
+
+    inserted: dict[tuple[UUID, UUID], UUID] = {}
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user_id, "course_id": course_id, "role": known_users[user_id].value}
+        for user_id, course_id in candidates
+    ]
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        stmt = (
+            pg_insert(Enrollment)
+            .values(rows[start:start + BULK_INSERT_BATCH_SIZE])
+            .on_conflict_do_nothing(constraint="unique_user_course")
+            .returning(Enrollment.id, Enrollment.user_id, Enrollment.course_id)
+        )
+        for row in await db.execute(stmt):
+            inserted[(row.user_id, row.course_id)] = row.id
+
+    per_course: dict[UUID, int] = {}
+    per_role: dict[tuple[UUID, str], int] = {}
+    for user_id, course_id in inserted:
+        per_course[course_id] = per_course.get(course_id, 0) + 1
+        key = (course_id, known_users[user_id].value)
+        per_role[key] = per_role.get(key, 0) + 1
+    if per_course:
+        courses_table = Course.__table__
+        await db.execute(
+            update(courses_table)
+            .where(courses_table.c.id == bindparam("b_course_id"))
+            .values(enrolled_count=courses_table.c.enrolled_count + bindparam("b_added")),
+            [{"b_course_id": cid, "b_added": added} for cid, added in per_course.items()],
+        )
+        await record_enrollment_counts(db, per_role)
+    await db.commit()
+
+    results = []
+    for pair, outcome in zip(pairs, outcomes):
+        if outcome is not None:
+            results.append((outcome, None))
+        elif pair in inserted:
+            results.append((EnrollmentOutcome.enrolled, inserted[pair]))
+        else:
+            results.append((EnrollmentOutcome.duplicate, None))
+    return results
@@ -0,0 +1,108 @@
+"""Rotating refresh tokens.
+
+A refresh token is 256 random bits handed to the client once; only its
+SHA-256 digest is stored. A slow hash buys nothing for random secrets of
+that size, and renewing a session then costs one indexed lookup rather
+than a bcrypt round. Every refresh revokes the presented token and issues
+a successor in the same family. Presenting a revoked token again means it
+leaked (or the client is confused), so the whole family is revoked.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+class InvalidRefreshToken(Exception):
+    """Unknown, expired or revoked refresh token, or an inactive user."""
+
+
+class RefreshTokenReused(InvalidRefreshToken):
+    """An already rotated token was presented again; its family is now revoked."""
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: uuid.UUID, family_id: Optional[uuid.UUID] = None) -> str:
+    """Store a new refresh token for ``user_id``; the caller commits."""
+    token = secrets.token_urlsafe(32)
+    await db.execute(insert(RefreshToken).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4(),
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days),
+    ))
+    return token
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[User, str]:
+    """Revoke ``token`` and issue its successor; returns the user and the new token."""
+    token_hash = hash_refresh_token(token)
+    # Revoking and loading the user in one statement also settles concurrent
+    # refreshes of the same token: only one of them gets the row back
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+            RefreshToken.user_id == User.id,
+        )
+        .values(revoked_at=func.now())
+        .returning(RefreshToken.family_id, User.id, User.email, User.full_name, User.role, User.is_active)
+    )
+    row = result.one_or_none()
+    if row is None:
+        await _check_reuse(db, token_hash)
+        raise InvalidRefreshToken()
+    if not row.is_active:
+        await _revoke_family(db, row.family_id)
+        raise InvalidRefreshToken()
+
+    new_token = await issue_refresh_token(db, row.id, row.family_id)
+    await db.commit()
+    user = User(id=row.id, email=row.email, full_name=row.full_name, role=row.role, is_active=row.is_active)
+    return user, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """Revoke the family ``token`` belongs to (logout); False if it is unknown."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is None:
+        return False
+    await _revoke_family(db, family_id)
+    return True
+
+
+async def _check_reuse(db: AsyncSession, token_hash: str) -> None:
+    result = await db.execute(
+        select(RefreshToken.family_id, RefreshToken.revoked_at, RefreshToken.expires_at)
+        .where(RefreshToken.token_hash == token_hash)
+    )
+    row = result.one_or_none()
+    if row is not None and row.revoked_at is not None and row.expires_at > datetime.now(timezone.utc):
+        await _revoke_family(db, row.family_id)
+        raise RefreshTokenReused()
+
+
+async def _revoke_family(db: AsyncSession, family_id: uuid.UUID) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+    await db.commit()
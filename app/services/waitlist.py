@@ -0,0 +1,150 @@
+"""Course waitlists with FIFO promotion.
+
+Students join a waitlist instead of retrying full courses. An in-process
+promoter is nudged whenever seats may have freed up (deregistration,
+capacity increase, reactivation) and moves the oldest entries into
+enrollments transactionally.
+"""
+import asyncio
+import logging
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, String, cast
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AsyncSessionLocal
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.services.analytics import record_enrollment_counts
+
+logger = logging.getLogger(__name__)
+
+
+async def promote_waitlist(db: AsyncSession, course_id: UUID) -> int:
+    """Fill free seats of a course from its waitlist, oldest first.
+
+    The course row is locked for the whole transaction, which serializes the
+    promotion with single-seat claims on the same course. Returns the number
+    of students enrolled.
+    """
+    promoted = 0
+    while True:
+        course = (
+            await db.execute(
+                select(Course.is_active, Course.capacity, Course.enrolled_count)
+                .where(Course.id == course_id)
+                .with_for_update()
+            )
+        ).one_or_none()
+        if course is None or not course.is_active or course.enrolled_count >= course.capacity:
+            break
+
+        entries = (
+            await db.execute(
+                select(WaitlistEntry.id, WaitlistEntry.user_id)
+                .where(WaitlistEntry.course_id == course_id)
+                .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+                .limit(course.capacity - course.enrolled_count)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not entries:
+            break
+
+        roles = dict(
+            (
+                await db.execute(
+                    select(User.id, cast(User.role, String)).where(User.id.in_([entry.user_id for entry in entries]))
+                )
+            ).tuples()
+        )
+        # Entries for students who got in some other way are simply dropped
+        inserted = (
+            await db.execute(
+                pg_insert(Enrollment)
+                .values([
+                    {"id": uuid.uuid4(), "user_id": entry.user_id, "course_id": course_id,
+                     "role": roles.get(entry.user_id)}
+                    for entry in entries
+                ])
+                .on_conflict_do_nothing(constraint="unique_user_course")
+                .returning(Enrollment.role)
+            )
+        ).scalars().all()
+        await db.execute(delete(WaitlistEntry).where(WaitlistEntry.id.in_([entry.id for entry in entries])))
+        if inserted:
+            await db.execute(
+                update(Course)
+                .where(Course.id == course_id)
+                .values(enrolled_count=Course.enrolled_count + len(inserted))
+            )
+            counts: dict[tuple[UUID, str], int] = {}
+            for role in inserted:
+                counts[(course_id, role)] = counts.get((course_id, role), 0) + 1
+            await record_enrollment_counts(db, counts)
+        await db.commit()
+        promoted += len(inserted)
+    await db.rollback()
+    return promoted
+
+
+class WaitlistPromoter:
+    """Background task that promotes waitlists for courses it is notified about."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: set[UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="waitlist-promoter")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+        self._pending.clear()
+
+    def notify(self, course_id: UUID) -> None:
+        # Coalesce repeated nudges for a course that is already queued
+        if self._queue is None or course_id in self._pending:
+            return
+        self._pending.add(course_id)
+        self._queue.put_nowait(course_id)
+
+    async def _enqueue_backlog(self) -> None:
+        # Nudges are in-memory only; pick up anything left over from a restart
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(WaitlistEntry.course_id).distinct())
+            for course_id in result.scalars():
+                self.notify(course_id)
+
+    async def _run(self) -> None:
+        try:
+            await self._enqueue_backlog()
+        except Exception:
+            logger.exception("Failed to load waitlist backlog")
+        while True:
+            course_id = await self._queue.get()
+            self._pending.discard(course_id)
+            try:
+                async with AsyncSessionLocal() as session:
+                    promoted = await promote_waitlist(session, course_id)
+                if promoted:
+                    logger.info("Promoted %d waitlisted students into course %s", promoted, course_id)
+            except Exception:
+                logger.exception("Waitlist promotion failed for course %s", course_id)
+
+
+waitlist_promoter = WaitlistPromoter()
@@ -0,0 +1,194 @@
+"""Synthetic dataset generator for scale testing.
+
+Fills the database in DATABASE_URL with users, courses and enrollments whose
+course popularity follows a Zipf-like distribution, so a handful of courses
+get most of the traffic as they do in production.
+
+    python -m benchmarks.generate_dataset --users 300000 --courses 5000 --enrollments 5000000
+
+Rows are streamed in batches through asyncpg's binary COPY (falling back to
+executemany on other drivers) rather than the ORM unit of work, and one
+bcrypt hash is computed up front and shared by every generated user. Course
+``enrolled_count`` is set to the generated totals, with capacity at least
+that high, so the maintained seat counter stays consistent, and the
+enrollment analytics aggregates are rebuilt for the generated courses.
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, insert, text, update
+
+from app.core.config import engine
+from app.core.security import get_password_hash
+from app.models.user import Base, User, Role
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.services.analytics import rebuild_course_stats
+
+USER_COLUMNS = ["id", "email", "hashed_password", "full_name", "is_active", "role", "created_at"]
+COURSE_COLUMNS = ["id", "code", "title", "description", "capacity", "enrolled_count", "is_active", "created_at"]
+ENROLLMENT_COLUMNS = ["id", "user_id", "course_id", "enrolled_at", "role"]
+
+
+class BulkWriter:
+    """Writes record batches with COPY on asyncpg, executemany otherwise."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._driver = None
+
+    async def _driver_connection(self):
+        if self._driver is None:
+            raw = await self.conn.get_raw_connection()
+            self._driver = raw.driver_connection
+        return self._driver
+
+    async def write(self, table, columns: list[str], records: list[tuple]) -> None:
+        if not records:
+            return
+        driver = await self._driver_connection()
+        if hasattr(driver, "copy_records_to_table"):
+            await driver.copy_records_to_table(table.name, records=records, columns=columns)
+        else:
+            await self.conn.execute(insert(table), [dict(zip(columns, record)) for record in records])
+
+
+def zipf_cumulative_weights(count: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def pick_courses(rng: random.Random, cumulative: list[float], k: int) -> set[int]:
+    """Sample ``k`` distinct course indexes following the popularity weights."""
+    total = cumulative[-1]
+    chosen: set[int] = set()
+    attempts = 0
+    while len(chosen) < k and attempts < k * 20:
+        chosen.add(bisect.bisect_left(cumulative, rng.random() * total))
+        attempts += 1
+    return chosen
+
+
+def random_timestamp(rng: random.Random, now: datetime, days: int) -> datetime:
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+async def generate(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    # Hash once: bcrypt per row would dominate the whole load
+    hashed_password = get_password_hash(args.password)
+
+    course_ids = [uuid.uuid4() for _ in range(args.courses)]
+    enrolled_counts = [0] * args.courses
+    cumulative = zipf_cumulative_weights(args.courses, args.skew)
+    mean_per_user = max(args.enrollments / max(args.users, 1), 1e-9)
+    max_per_user = min(args.courses, max(1, int(mean_per_user * 3)))
+
+    async with engine.connect() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.commit()
+        writer = BulkWriter(conn)
+
+        courses = [
+            (course_ids[i], f"{args.prefix.upper()}-{i:06d}", f"Synthetic course {i}",
+             "Generated for scale testing", 1, 0, rng.random() > 0.05,
+             random_timestamp(rng, now, args.days))
+            for i in range(args.courses)
+        ]
+        await writer.write(Course.__table__, COURSE_COLUMNS, courses)
+        await conn.commit()
+        print(f"courses: {args.courses} in {time.perf_counter() - started:.1f}s")
+
+        enrollments_left = args.enrollments
+        users_written = 0
+        enrollment_batch: list[tuple] = []
+        for batch_start in range(0, args.users, args.batch_size):
+            batch_size = min(args.batch_size, args.users - batch_start)
+            users = []
+            for offset in range(batch_size):
+                index = batch_start + offset
+                role = Role.admin if index < args.admins else Role.student
+                users.append((uuid.uuid4(), f"{args.prefix}-{index}@{args.email_domain}", hashed_password,
+                              f"Synthetic User {index}", True, role.value, random_timestamp(rng, now, args.days)))
+            await writer.write(User.__table__, USER_COLUMNS, users)
+
+            for user in users:
+                users_written += 1
+                if enrollments_left <= 0:
+                    continue
+                # Exponential spread around the mean, capped by what is left
+                target = min(max_per_user, enrollments_left, round(rng.expovariate(1 / mean_per_user)))
+                for course_index in pick_courses(rng, cumulative, target):
+                    enrolled_counts[course_index] += 1
+                    enrollment_batch.append((uuid.uuid4(), user[0], course_ids[course_index],
+                                             random_timestamp(rng, now, args.days), user[5]))
+                    enrollments_left -= 1
+                if len(enrollment_batch) >= args.batch_size:
+                    await writer.write(Enrollment.__table__, ENROLLMENT_COLUMNS, enrollment_batch)
+                    enrollment_batch = []
+            await conn.commit()
+            print(f"users: {users_written}/{args.users}  enrollments: {args.enrollments - enrollments_left}"
+                  f"  ({time.perf_counter() - started:.1f}s)")
+
+        await writer.write(Enrollment.__table__, ENROLLMENT_COLUMNS, enrollment_batch)
+
+        # Seat counters and capacities from the generated totals
+        courses_table = Course.__table__
+        await conn.execute(
+            update(courses_table)
+            .where(courses_table.c.id == bindparam("b_id"))
+            .values(enrolled_count=bindparam("b_count"), capacity=bindparam("b_capacity")),
+            [
+                {"b_id": course_ids[i], "b_count": count,
+                 "b_capacity": max(count + rng.randint(0, args.spare_seats), args.min_capacity)}
+                for i, count in enumerate(enrolled_counts)
+            ],
+        )
+        # COPY bypassed the write paths that maintain the /analytics aggregates
+        await rebuild_course_stats(conn, course_ids)
+        await conn.commit()
+        print(f"analytics aggregates rebuilt ({time.perf_counter() - started:.1f}s)")
+        await conn.execute(text("ANALYZE users"))
+        await conn.execute(text("ANALYZE courses"))
+        await conn.execute(text("ANALYZE enrollments"))
+        await conn.execute(text("ANALYZE course_enrollment_role_stats"))
+        await conn.execute(text("ANALYZE enrollment_daily_stats"))
+        await conn.commit()
+
+    await engine.dispose()
+    total = args.enrollments - enrollments_left
+    print(f"done: {args.users} users, {args.courses} courses, {total} enrollments "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--admins", type=int, default=5, help="the first N users are admins")
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--enrollments", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for course popularity")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365, help="spread timestamps over this many days")
+    parser.add_argument("--min-capacity", type=int, default=30)
+    parser.add_argument("--spare-seats", type=int, default=20, help="random free seats added per course")
+    parser.add_argument("--prefix", default="synth", help="email/course-code prefix, must be unique per load")
+    parser.add_argument("--email-domain", default="example.com")
+    parser.add_argument("--password", default="synthetic-password")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    if args.courses < 1:
+        parser.error("--courses must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(generate(parse_args()))
@@ -0,0 +1,94 @@
+"""ORM vs lean read path for the large list endpoints.
+
+Times one page of courses and of enrollments both ways against the database
+in DATABASE_URL (load one with ``benchmarks.generate_dataset`` first):
+
+* ``orm``  - ORM instances validated through the response model and dumped
+  to JSON, which is what FastAPI does for a ``response_model`` route;
+* ``lean`` - column rows encoded straight to bytes (app/core/fast_json.py).
+
+    python -m benchmarks.read_path --limit 1000 --iterations 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.api.courses import COURSE_LIST_COLUMNS
+from app.core.config import AsyncSessionLocal, engine
+from app.core.fast_json import rows_response
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.schemas.course import Course as CourseSchema
+from app.schemas.enrollment import Enrollment as EnrollmentSchema
+
+ENROLLMENT_COLUMNS = (Enrollment.user_id, Enrollment.course_id, Enrollment.id, Enrollment.enrolled_at)
+
+
+def orm_page(model, schema, sort_column, limit: int) -> Callable[[], Awaitable[bytes]]:
+    adapter = TypeAdapter(list[schema])
+
+    async def run() -> bytes:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(model).order_by(sort_column, model.id).limit(limit))
+            items = result.scalars().all()
+            return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    return run
+
+
+def lean_page(columns, sort_column, id_column, limit: int) -> Callable[[], Awaitable[bytes]]:
+    async def run() -> bytes:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(*columns).order_by(sort_column, id_column).limit(limit))
+            return rows_response(result.all()).body
+    return run
+
+
+async def measure(run: Callable[[], Awaitable[bytes]], iterations: int) -> tuple[float, int]:
+    """Median milliseconds per page and the number of bytes produced."""
+    body = await run()  # warm the pool and the statement cache
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(body)
+
+
+async def main(args: argparse.Namespace) -> int:
+    cases = {
+        "courses": (
+            orm_page(Course, CourseSchema, Course.created_at, args.limit),
+            lean_page(COURSE_LIST_COLUMNS, Course.created_at, Course.id, args.limit),
+        ),
+        "enrollments": (
+            orm_page(Enrollment, EnrollmentSchema, Enrollment.enrolled_at, args.limit),
+            lean_page(ENROLLMENT_COLUMNS, Enrollment.enrolled_at, Enrollment.id, args.limit),
+        ),
+    }
+    try:
+        for name, (orm_run, lean_run) in cases.items():
+            orm_ms, orm_bytes = await measure(orm_run, args.iterations)
+            lean_ms, lean_bytes = await measure(lean_run, args.iterations)
+            speedup = orm_ms / lean_ms if lean_ms else 0.0
+            print(f"{name:12s} limit={args.limit}  orm={orm_ms:.2f}ms ({orm_bytes} B)  "
+                  f"lean={lean_ms:.2f}ms ({lean_bytes} B)  speedup={speedup:.2f}x")
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=1000, help="rows per page")
+    parser.add_argument("--iterations", type=int, default=50)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,267 @@
+"""In-process load benchmarks for the hot endpoints.
+
+Drives the ASGI app from app/main.py through httpx's ASGI transport (no
+network, no uvicorn) with many concurrent clients against the database in
+DATABASE_URL, and reports RPS and latency percentiles per scenario.
+
+    python -m benchmarks.run                          # run and print
+    python -m benchmarks.run --save-baseline          # store benchmarks/baselines/default.json
+    python -m benchmarks.run --compare --threshold 0.15
+
+Requests rejected by admission control are counted as ``shed``, not errors.
+With --compare the exit code is 1 when any scenario's p95 grew, or its RPS
+dropped, by more than the threshold relative to the stored baseline.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app.main import app
+from app.core.config import AsyncSessionLocal, engine
+from app.core.security import get_password_hash, create_access_token
+from app.core.principal_cache import principal_claims
+from app.models.user import Base, User, Role
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.analytics import EnrollmentDailyStats
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+PASSWORD = "benchmark-password"
+
+
+class ScenarioResult:
+    def __init__(self, name: str, latencies: list[float], statuses: list[int], elapsed: float):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.statuses = statuses
+        self.elapsed = elapsed
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(round(pct / 100 * (len(self.latencies) - 1))))
+        return self.latencies[index]
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "rps": round(len(self.latencies) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(self.latencies) * 1000, 2) if self.latencies else 0.0,
+            "errors": sum(1 for status in self.statuses if status >= 500),
+            "shed": sum(1 for status in self.statuses if status == 429),
+        }
+
+
+class Fixture:
+    """Benchmark data, tagged with a run id so it can be removed afterwards."""
+
+    def __init__(self, students: int, courses: int):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.student_count = students
+        self.course_count = courses
+        self.students: list[tuple[uuid.UUID, str]] = []
+        self.admin_token = ""
+        self.student_tokens: list[str] = []
+        self.contended_course_id: uuid.UUID = uuid.uuid4()
+        self.open_course_ids: list[uuid.UUID] = []
+
+    async def create(self) -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        # One bcrypt hash shared by every benchmark user
+        hashed = get_password_hash(PASSWORD)
+        admin = {"id": uuid.uuid4(), "email": f"bench-admin-{self.run_id}@example.com",
+                 "hashed_password": hashed, "full_name": "Bench Admin", "role": Role.admin, "is_active": True}
+        students = [
+            {"id": uuid.uuid4(), "email": f"bench-{self.run_id}-{i}@example.com",
+             "hashed_password": hashed, "full_name": f"Bench Student {i}", "role": Role.student, "is_active": True}
+            for i in range(self.student_count)
+        ]
+        self.open_course_ids = [uuid.uuid4() for _ in range(self.course_count)]
+        courses = [{"id": self.contended_course_id, "code": f"BENCH-{self.run_id}-HOT",
+                    "title": "Contended", "capacity": 10, "is_active": True}]
+        courses += [{"id": cid, "code": f"BENCH-{self.run_id}-{i}", "title": f"Open {i}",
+                     "capacity": self.student_count, "is_active": True}
+                    for i, cid in enumerate(self.open_course_ids)]
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(User), [admin] + students)
+            await session.execute(insert(Course), courses)
+            await session.commit()
+
+        self.students = [(row["id"], row["email"]) for row in students]
+        self.admin_token = self._token(admin)
+        self.student_tokens = [self._token(row) for row in students]
+
+    @staticmethod
+    def _token(row: dict) -> str:
+        user = User(**row)
+        return create_access_token({"sub": user.email, **principal_claims(user)})
+
+    async def drop(self) -> None:
+        course_ids = [self.contended_course_id] + self.open_course_ids
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Enrollment).where(Enrollment.course_id.in_(course_ids)))
+            await session.execute(delete(Course).where(Course.id.in_(course_ids)))
+            # Role stats cascade with the courses; daily history has no foreign key
+            await session.execute(delete(EnrollmentDailyStats).where(EnrollmentDailyStats.course_id.in_(course_ids)))
+            await session.execute(delete(User).where(User.email.like(f"bench-%{self.run_id}%")))
+            await session.commit()
+
+
+async def run_scenario(
+    name: str,
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    statuses: list[int] = []
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                response = await request(client, index)
+                statuses.append(response.status_code)
+            except Exception:
+                statuses.append(599)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ScenarioResult(name, latencies, statuses, time.perf_counter() - start)
+
+
+def build_scenarios(fixture: Fixture) -> dict[str, Callable]:
+    def auth(token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    def student(index: int) -> tuple[uuid.UUID, str, str]:
+        i = index % len(fixture.students)
+        user_id, email = fixture.students[i]
+        return user_id, email, fixture.student_tokens[i]
+
+    async def login(client, index):
+        _, email, _ = student(index)
+        return await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+
+    async def list_courses(client, index):
+        return await client.get("/courses/", params={"limit": 100})
+
+    async def list_courses_1000(client, index):
+        return await client.get("/courses/", params={"limit": 1000})
+
+    async def users_me(client, index):
+        return await client.get("/users/me", headers=auth(student(index)[2]))
+
+    async def enroll_contended(client, index):
+        user_id, _, token = student(index)
+        return await client.post("/enrollments/", headers=auth(token), json={
+            "user_id": str(user_id), "course_id": str(fixture.contended_course_id)})
+
+    async def enroll_uncontended(client, index):
+        user_id, _, token = student(index)
+        # Spread students over courses so each pair is enrolled at most once
+        course_id = fixture.open_course_ids[(index // len(fixture.students)) % len(fixture.open_course_ids)]
+        return await client.post("/enrollments/", headers=auth(token), json={
+            "user_id": str(user_id), "course_id": str(course_id)})
+
+    async def admin_listing(client, index):
+        return await client.get("/enrollments/", params={"limit": 100}, headers=auth(fixture.admin_token))
+
+    async def admin_listing_1000(client, index):
+        return await client.get("/enrollments/", params={"limit": 1000}, headers=auth(fixture.admin_token))
+
+    return {
+        "login": login,
+        "list_courses": list_courses,
+        "list_courses_1000": list_courses_1000,
+        "users_me": users_me,
+        "enroll_contended": enroll_contended,
+        "enroll_uncontended": enroll_uncontended,
+        "admin_listing": admin_listing,
+        "admin_listing_1000": admin_listing_1000,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    fixture = Fixture(students=args.students, courses=args.courses)
+    await fixture.create()
+    scenarios = build_scenarios(fixture)
+    selected = args.scenario or list(scenarios)
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name in selected:
+                    total = min(args.requests, args.students * len(fixture.open_course_ids)) \
+                        if name == "enroll_uncontended" else args.requests
+                    result = await run_scenario(name, client, scenarios[name], total, args.concurrency)
+                    results[name] = result.as_dict()
+                    print(f"{name:20s} " + "  ".join(f"{k}={v}" for k, v in results[name].items()))
+    finally:
+        if not args.keep_data:
+            await fixture.drop()
+        await engine.dispose()
+
+    baseline_path = BASELINE_DIR / f"{args.baseline}.json"
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {baseline_path}")
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}")
+            return 1
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--baseline", default="default", help="baseline name under benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete the generated rows")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,11 @@
+import pytest
+from app.core.query_profiler import assert_max_queries
+
+@pytest.fixture
+def query_budget():
+    """Context manager asserting a maximum SQL statement count, e.g.
+
+        with query_budget(2):
+            await client.get("/courses/")
+    """
+    return assert_max_queries
@@ -5,6 +5,13 @@ from app.core.config import settings
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.models.user import Base
+from app.core import security
+from app.core.security import get_password_hash_async, verify_password_async, PasswordHasherBusy
+from app.core.idempotency import idempotency_store
+from app.models.idempotency_key import IdempotencyKey
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
 
 @pytest.fixture(scope="session")
 async def engine():
@@ -53,4 +60,76 @@ async def test_login(client):
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
-    assert data["token_type"] == "bearer"
\ No newline at end of file
+    assert data["token_type"] == "bearer"
+
+@pytest.mark.asyncio
+async def test_register_idempotency_key_replays(client):
+    payload = {"email": "retry@example.com", "password": "password", "full_name": "Retry User"}
+    headers = {"Idempotency-Key": "register-retry-1"}
+    first = await client.post("/auth/register", json=payload, headers=headers)
+    assert first.status_code == 200
+
+    # A retry gets the original response instead of "Email already registered"
+    retry = await client.post("/auth/register", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # Anonymous keys are scoped to the body: a different request is not a replay
+    other = await client.post("/auth/register", json={**payload, "full_name": "Someone Else"}, headers=headers)
+    assert other.status_code == 400
+    assert "Idempotent-Replayed" not in other.headers
+
+@pytest.mark.asyncio
+async def test_idempotency_claim_left_by_crashed_worker_is_taken_over(client, db_session):
+    body = json.dumps({"email": "lease@example.com", "password": "password", "full_name": "Lease User"}).encode()
+    request_hash = hashlib.sha256(body).hexdigest()
+    # An unfinished claim whose lease ran out, as a crashed worker would leave it
+    db_session.add(IdempotencyKey(
+        scope=f"POST /auth/register|anon:{request_hash}", key="lease-1", request_hash=request_hash,
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    ))
+    await db_session.commit()
+
+    response = await client.post("/auth/register", content=body, headers={
+        "Idempotency-Key": "lease-1", "Content-Type": "application/json"})
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+    assert idempotency_store.lease_seconds < idempotency_store.ttl_seconds
+
+@pytest.mark.asyncio
+async def test_refresh_token_rotation_and_reuse(client):
+    await client.post("/auth/register", json={
+        "email": "refresh@example.com",
+        "password": "password",
+        "full_name": "Refresh User"
+    })
+    login_response = await client.post("/auth/login", data={
+        "username": "refresh@example.com",
+        "password": "password"
+    })
+    first = login_response.json()["refresh_token"]
+
+    response = await client.post("/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+    me = await client.get("/users/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+    assert me.json()["email"] == "refresh@example.com"
+
+    # Replaying the rotated token revokes the whole family, including its successor
+    reused = await client.post("/auth/refresh", json={"refresh_token": first})
+    assert reused.status_code == 401
+    revoked = await client.post("/auth/refresh", json={"refresh_token": second})
+    assert revoked.status_code == 401
+
+@pytest.mark.asyncio
+async def test_async_password_hashing(monkeypatch):
+    hashed = await get_password_hash_async("password")
+    assert await verify_password_async("password", hashed)
+    assert not await verify_password_async("wrong-password", hashed)
+
+    # Saturated executor rejects immediately instead of queueing
+    monkeypatch.setattr(security, "_hash_in_flight", settings.password_hash_workers + settings.password_hash_max_queue)
+    with pytest.raises(PasswordHasherBusy):
+        await verify_password_async("password", hashed)
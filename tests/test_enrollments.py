@@ -1,10 +1,23 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
 import pytest
 from httpx import AsyncClient
 from app.main import app
 from app.core.config import settings
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.models.user import Base
+from sqlalchemy import select, func, insert, update
+from app.models.user import Base, User, Role
+from app.models.course import Course
+from app.models.enrollment import Enrollment, EnrollmentOutcome
+from app.models.analytics import CourseRoleStats
+from app.services.enrollment import claim_seat, release_seat, bulk_claim_seats
+from app.services.analytics import role_breakdown, daily_enrollments
+from app.core.admission import AdmissionControlMiddleware, RouteLimit, TokenBuckets
+from app.core.security import create_access_token
 
 @pytest.fixture(scope="session")
 async def engine():
@@ -47,4 +60,204 @@ async def test_enroll_course(client):
         "course_id": 1
     }, headers=headers)
     # Will fail because no course, but test the endpoint.
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_concurrent_enrollments_never_overbook(engine):
+    capacity = 5
+    student_count = 300
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    course_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(student_count)]
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"RACE-{course_id.hex[:8]}", title="Race", capacity=capacity))
+        await session.execute(insert(User), [
+            {"id": uid, "email": f"race-{uid.hex}@example.com", "hashed_password": "x", "full_name": "Racer"}
+            for uid in user_ids
+        ])
+        await session.commit()
+
+    async def enroll(user_id):
+        async with async_session() as session:
+            outcome, _ = await claim_seat(session, user_id, course_id)
+            return outcome
+
+    outcomes = await asyncio.gather(*(enroll(uid) for uid in user_ids))
+
+    assert outcomes.count(EnrollmentOutcome.enrolled) == capacity
+    assert outcomes.count(EnrollmentOutcome.full) == student_count - capacity
+
+    async with async_session() as session:
+        enrolled_rows = await session.scalar(
+            select(func.count(Enrollment.id)).where(Enrollment.course_id == course_id)
+        )
+        counter = await session.scalar(select(Course.enrolled_count).where(Course.id == course_id))
+    assert enrolled_rows == capacity
+    assert counter == capacity
+
+
+@pytest.mark.asyncio
+async def test_export_enrollments_requires_admin(client):
+    response = await client.get("/enrollments/admin/export", params={"format": "csv"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_export_enrollments_streams_rows(client, engine):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    course_code = f"EXP-{course_id.hex[:8]}"
+    user_ids = [uuid.uuid4() for _ in range(2)]
+    admin_email = f"export-admin-{course_id.hex[:8]}@example.com"
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=course_code, title="Export", capacity=5))
+        session.add(User(email=admin_email, hashed_password="x", full_name="Export Admin", role=Role.admin))
+        await session.execute(insert(User), [
+            {"id": uid, "email": f"export-{uid.hex}@example.com", "hashed_password": "x", "full_name": "Export"}
+            for uid in user_ids
+        ])
+        await session.commit()
+    enrollment_ids = set()
+    for uid in user_ids:
+        async with async_session() as session:
+            _, enrollment = await claim_seat(session, uid, course_id)
+            enrollment_ids.add(str(enrollment.id))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin_email})}"}
+    expected = {(str(uid), f"export-{uid.hex}@example.com") for uid in user_ids}
+
+    response = await client.get("/enrollments/admin/export", params={"with_details": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    ours = [row for row in rows if row["course_id"] == str(course_id)]
+    assert {row["id"] for row in ours} == enrollment_ids
+    assert {(row["user_id"], row["user_email"]) for row in ours} == expected
+    assert {row["course_code"] for row in ours} == {course_code}
+    assert all(row["enrolled_at"] for row in ours)
+
+    response = await client.get("/enrollments/admin/export", params={"format": "csv", "with_details": True},
+                                headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.reader(io.StringIO(response.text))
+    assert next(reader) == ["id", "user_id", "course_id", "enrolled_at", "user_email", "course_code"]
+    ours = [row for row in reader if row[2] == str(course_id)]
+    assert {row[0] for row in ours} == enrollment_ids
+    assert {(row[1], row[4]) for row in ours} == expected
+    assert {row[5] for row in ours} == {course_code}
+
+
+@pytest.mark.asyncio
+async def test_bulk_enrollment_report(engine):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"BULK-{course_id.hex[:8]}", title="Bulk", capacity=2))
+        await session.execute(insert(User), [
+            {"id": uid, "email": f"bulk-{uid.hex}@example.com", "hashed_password": "x", "full_name": "Bulk"}
+            for uid in user_ids
+        ])
+        await session.commit()
+
+    pairs = [
+        (user_ids[0], course_id),
+        (user_ids[0], course_id),
+        (uuid.uuid4(), course_id),
+        (user_ids[1], uuid.uuid4()),
+        (user_ids[1], course_id),
+        (user_ids[2], course_id),
+    ]
+    async with async_session() as session:
+        results = await bulk_claim_seats(session, pairs)
+
+    assert [outcome for outcome, _ in results] == [
+        EnrollmentOutcome.enrolled,
+        EnrollmentOutcome.duplicate,
+        EnrollmentOutcome.user_not_found,
+        EnrollmentOutcome.course_not_found,
+        EnrollmentOutcome.enrolled,
+        EnrollmentOutcome.full,
+    ]
+    async with async_session() as session:
+        counter = await session.scalar(select(Course.enrolled_count).where(Course.id == course_id))
+    assert counter == 2
+
+
+@pytest.mark.asyncio
+async def test_enrollment_analytics_follow_writes(engine):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"STAT-{course_id.hex[:8]}", title="Stats", capacity=10))
+        await session.execute(insert(User), [
+            {"id": uid, "email": f"stat-{uid.hex}@example.com", "hashed_password": "x", "full_name": "Stats"}
+            for uid in user_ids
+        ])
+        await session.commit()
+
+    async with async_session() as session:
+        _, enrollment = await claim_seat(session, user_ids[0], course_id)
+        await bulk_claim_seats(session, [(user_ids[1], course_id), (user_ids[2], course_id)])
+        await release_seat(session, enrollment.id)
+
+    async with async_session() as session:
+        assert await role_breakdown(session, course_id) == {"student": 2}
+        days = await daily_enrollments(session, 1, course_id)
+    assert [(row.added, row.removed) for row in days] == [(3, 1)]
+
+
+@pytest.mark.asyncio
+async def test_role_change_does_not_move_enrollment_analytics(engine):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    user_id = uuid.uuid4()
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"ROLE-{course_id.hex[:8]}", title="Roles", capacity=10))
+        session.add(User(id=user_id, email=f"role-{user_id.hex}@example.com", hashed_password="x", full_name="Role"))
+        await session.commit()
+
+    async with async_session() as session:
+        _, enrollment = await claim_seat(session, user_id, course_id)
+        await session.execute(update(User).where(User.id == user_id).values(role=Role.instructor))
+        await session.commit()
+        assert await role_breakdown(session, course_id) == {"student": 1}
+
+        await release_seat(session, enrollment.id)
+        assert await role_breakdown(session, course_id) == {}
+        counts = (await session.execute(
+            select(CourseRoleStats.role, CourseRoleStats.enrolled).where(CourseRoleStats.course_id == course_id)
+        )).all()
+    assert {role: enrolled for role, enrolled in counts} == {"student": 0}
+
+
+@pytest.mark.asyncio
+async def test_admission_control_sheds_excess_writes():
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionControlMiddleware(
+        slow_app,
+        [RouteLimit("enrollment", "POST", ("/enrollments",), 2)],
+        TokenBuckets(rate_per_second=100, burst=100),
+    )
+
+    async def call(method, path):
+        messages = []
+        async def receive():
+            return {"type": "http.request"}
+        async def send(message):
+            messages.append(message)
+        await middleware({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+        return messages[0]
+
+    results = await asyncio.gather(*(call("POST", "/enrollments/") for _ in range(4)), call("GET", "/courses/"))
+    statuses = [message["status"] for message in results]
+    assert statuses.count(429) == 2
+    assert statuses[-1] == 200
+    rejected = next(message for message in results if message["status"] == 429)
+    assert (b"retry-after", b"1") in rejected["headers"]
@@ -0,0 +1,92 @@
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.metrics import Histogram, route_label
+from app.core.query_profiler import QueryProfile, normalize_sql
+import asyncio
+from sqlalchemy.exc import OperationalError
+from app.core import warmup
+from app.core.warmup import StartupTimer, readiness
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(app=app, base_url="http://testserver") as ac:
+        yield ac
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    await client.get("/courses/")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/courses/",status="200"}' in response.text
+    assert 'db_pool_checked_out{pool="primary"}' in response.text
+
+@pytest.mark.asyncio
+async def test_health_and_readiness_probes(client):
+    readiness.mark_not_ready()
+    assert (await client.get("/healthz")).status_code == 200
+    assert (await client.get("/readyz")).status_code == 503
+    readiness.mark_ready()
+    assert (await client.get("/readyz")).json() == {"status": "ready"}
+
+def test_startup_timer_summary():
+    timer = StartupTimer()
+    timer.record("imports", 0.25)
+    with timer.phase("pool"):
+        pass
+    assert timer.summary().startswith("Startup took 250ms: imports 250ms, pool ")
+
+@pytest.mark.asyncio
+async def test_warm_pool_failure_releases_other_connections(monkeypatch):
+    opened = []
+
+    class FakeSession:
+        def __init__(self, *args, **kwargs):
+            self.closed = False
+            opened.append(self)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            self.closed = True
+
+        async def connection(self):
+            if len(opened) == 3:
+                raise OperationalError("SELECT 1", {}, ConnectionRefusedError())
+
+    class FakeEngine:
+        class pool:
+            @staticmethod
+            def size():
+                return 4
+
+    monkeypatch.setattr(warmup, "AsyncSession", FakeSession)
+    # The siblings already waiting on the barrier must not hang
+    with pytest.raises(OperationalError):
+        await asyncio.wait_for(warmup.warm_pool(FakeEngine()), timeout=2)
+    assert opened and all(session.closed for session in opened)
+
+def test_histogram_render():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.labels("/x").observe(0.05)
+    histogram.labels("/x").observe(0.5)
+    text = histogram.render()
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/x"} 2' in text
+
+def test_route_label_restores_router_prefix():
+    class Route:
+        path = "/{course_id}"
+    assert route_label({"path": "/courses/abc", "route": Route()}) == "/courses/{course_id}"
+    assert route_label({"path": "/nowhere"}) == "unmatched"
+
+def test_normalize_sql_groups_repeated_statements():
+    assert normalize_sql("SELECT * FROM users\n WHERE id = $1 AND code IN ('a', 'b')") == \
+        "SELECT * FROM users WHERE id = ? AND code IN (?)"
+    profile = QueryProfile()
+    profile.statements = [("SELECT 1 FROM courses WHERE id = $1", 0.001)] * 6
+    assert profile.repeated(5) == [("SELECT ? FROM courses WHERE id = ?", 6)]
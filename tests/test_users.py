@@ -4,7 +4,11 @@ from app.main import app
 from app.core.config import settings
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.models.user import Base
+from app.models.user import Base, User, Role
+from app.models.course import Course
+from app.core.principal_cache import PrincipalCache
+import time
+import uuid
 
 @pytest.fixture(scope="session")
 async def engine():
@@ -28,7 +32,7 @@ async def client():
         yield ac
 
 @pytest.mark.asyncio
-async def test_get_me(client):
+async def test_get_me(client, query_budget):
     # Register and login first
     await client.post("/auth/register", json={
         "email": "user@example.com",
@@ -41,7 +45,69 @@ async def test_get_me(client):
     })
     token = login_response.json()["access_token"]
     headers = {"Authorization": f"Bearer {token}"}
-    response = await client.get("/users/me", headers=headers)
+    with query_budget(1):
+        response = await client.get("/users/me", headers=headers)
     assert response.status_code == 200
     data = response.json()
-    assert data["email"] == "user@example.com"
\ No newline at end of file
+    assert data["email"] == "user@example.com"
+
+@pytest.mark.asyncio
+async def test_my_enrollments_embed_course(client, engine, query_budget):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"MINE-{course_id.hex[:8]}", title="Mine", capacity=10))
+        await session.commit()
+
+    register = await client.post("/auth/register", json={
+        "email": "mine@example.com",
+        "password": "password",
+        "full_name": "Mine User"
+    })
+    login_response = await client.post("/auth/login", data={
+        "username": "mine@example.com",
+        "password": "password"
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    await client.post("/enrollments/", json={
+        "user_id": register.json()["id"],
+        "course_id": str(course_id)
+    }, headers=headers)
+
+    # Enrollments and their courses come back from a single statement
+    with query_budget(1):
+        response = await client.get("/users/me/enrollments", headers=headers)
+    assert response.status_code == 200
+    [enrollment] = response.json()
+    assert enrollment["course"]["id"] == str(course_id)
+    assert enrollment["course"]["enrolled_count"] == 1
+
+def test_principal_cache_invalidation():
+    cache = PrincipalCache(maxsize=2, ttl_seconds=30, claims_max_age_seconds=60)
+    user = User(id=uuid.uuid4(), email="cached@example.com", full_name="Cached", role=Role.student, is_active=True)
+    cache.put(user)
+    assert cache.get("cached@example.com").id == user.id
+
+    claims = {"sub": user.email, "uid": str(user.id), "role": "student", "act": True, "iat": int(time.time()) - 1}
+    assert cache.from_claims(claims).role == Role.student
+
+    # Deactivation / role change must drop the entry and distrust older claims
+    cache.invalidate(user.email)
+    assert cache.get(user.email) is None
+    assert cache.from_claims(claims) is None
+
+def test_principal_cache_follows_other_workers():
+    cache = PrincipalCache(maxsize=10, ttl_seconds=30, claims_max_age_seconds=60)
+    users = [User(id=uuid.uuid4(), email=f"w{i}@example.com", full_name="W", role=Role.student, is_active=True)
+             for i in range(2)]
+    for user in users:
+        cache.put(user)
+
+    # A principal_changes payload from another worker
+    cache.on_notification(users[0].email)
+    assert cache.get(users[0].email) is None
+    assert cache.get(users[1].email) is not None
+
+    # Reconnected listener: anything may have changed meanwhile
+    cache.on_notification(None)
+    assert cache.get(users[1].email) is None
@@ -0,0 +1,72 @@
+import uuid
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.core.config import settings
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select, insert
+from app.models.user import Base, User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.waitlist import WaitlistEntry
+from app.services.enrollment import claim_seat, release_seat
+from app.services.waitlist import promote_waitlist
+
+@pytest.fixture(scope="session")
+async def engine():
+    engine = create_async_engine(settings.database_url, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(app=app, base_url="http://testserver") as ac:
+        yield ac
+
+@pytest.mark.asyncio
+async def test_join_waitlist_requires_auth(client):
+    response = await client.post("/waitlist/", json={
+        "user_id": str(uuid.uuid4()),
+        "course_id": str(uuid.uuid4())
+    })
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_promotion_is_fifo(engine):
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    course_id = uuid.uuid4()
+    first, second, third = (uuid.uuid4() for _ in range(3))
+    async with async_session() as session:
+        session.add(Course(id=course_id, code=f"WAIT-{course_id.hex[:8]}", title="Wait", capacity=1))
+        await session.execute(insert(User), [
+            {"id": uid, "email": f"wait-{uid.hex}@example.com", "hashed_password": "x", "full_name": "Waiter"}
+            for uid in (first, second, third)
+        ])
+        await session.commit()
+
+    async with async_session() as session:
+        _, enrollment = await claim_seat(session, first, course_id)
+    async with async_session() as session:
+        session.add(WaitlistEntry(user_id=second, course_id=course_id))
+        await session.commit()
+        session.add(WaitlistEntry(user_id=third, course_id=course_id))
+        await session.commit()
+
+    async with async_session() as session:
+        assert await promote_waitlist(session, course_id) == 0
+        await release_seat(session, enrollment.id)
+        assert await promote_waitlist(session, course_id) == 1
+
+    async with async_session() as session:
+        enrolled = set((await session.execute(
+            select(Enrollment.user_id).where(Enrollment.course_id == course_id)
+        )).scalars())
+        waiting = set((await session.execute(
+            select(WaitlistEntry.user_id).where(WaitlistEntry.course_id == course_id)
+        )).scalars())
+    assert enrolled == {second}
+    assert waiting == {third}